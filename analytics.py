@@ -0,0 +1,254 @@
+"""Append-only store of completed plans and calculator use, and cohort queries.
+
+The app records events with AnalyticsWriter.record(), which only adds the
+row to an in-memory buffer; a background thread writes the buffer out
+every few seconds as new part files, partitioned by event and day:
+
+    analytics/event=plan_completed/date=2026-10-17/part-<time>-<pid>-<n>.parquet
+    analytics/event=calculator/date=2026-10-17/part-<time>-<pid>-<n>.parquet
+
+Files are never rewritten, so several app processes can share the
+directory. Parquet needs pyarrow; without it (or with fmt="jsonl") the
+parts are JSONL. Rows carry a random per-session analytics_id (never the
+resume token), which ties a plan to the calculator inputs used with it.
+
+Query it from the command line:
+
+    python analytics.py groups            # most common selected groups
+    python analytics.py formats           # most common offering formats
+    python analytics.py price             # median price per student, per currency
+    python analytics.py summary --root analytics
+"""
+import argparse
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from itertools import count
+
+PLAN_FIELDS = [
+    "selected_group", "niche_statement", "specific_struggle", "acute_moment", "specific_who",
+    "size_check", "recognition", "availability", "format_pref", "location", "offerings",
+]
+CALCULATOR_FIELDS = [
+    "price_per_student", "students_per_series", "series_per_year", "scholarships",
+    "monthly_members", "monthly_price", "corporate_workshops", "corporate_price",
+    "venue_cost", "insurance_cost", "marketing_cost", "practice_hours", "education_hours", "time_value",
+    "net_income",
+]
+
+
+# ============================================
+# WRITING
+# ============================================
+
+class AnalyticsWriter:
+    """Buffered, non-blocking writer of analytics events.
+
+    record() never touches the disk, so it adds nothing to the click that
+    triggers it. Rows whose part file fails to write go back in the buffer
+    for the next flush; if the buffer is full (the disk is stuck) the oldest
+    rows are dropped rather than blocking the app.
+    """
+
+    def __init__(self, root="analytics", fmt="parquet", flush_interval=5.0, max_buffer=10000):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.fmt = fmt
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                self.fmt = "jsonl"
+        self.recorded = 0
+        self.written = 0
+        self.files = 0
+        self.last_error = None
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._parts = count()
+        if root:
+            threading.Thread(target=self._writer, daemon=True, name="analytics-writer").start()
+            atexit.register(self.flush)
+
+    def record(self, event, **fields):
+        """Queue one row for the event's partition"""
+        if not self.root:
+            return
+        row = {"event": event, "ts": round(time.time(), 3), **fields}
+        with self._lock:
+            self._buffer.append(row)
+            self.recorded += 1
+
+    def flush(self):
+        """Write everything buffered as one new part file per partition
+
+        If a write fails, the rows not yet in a part file are put back in
+        the buffer and the error is raised.
+        """
+        with self._write_lock:
+            with self._lock:
+                rows = list(self._buffer)
+                self._buffer.clear()
+            if not rows:
+                return
+            partitions = {}
+            for row in rows:
+                day = time.strftime("%Y-%m-%d", time.gmtime(row["ts"]))
+                partitions.setdefault((row["event"], day), []).append(row)
+            unwritten = list(partitions.items())
+            try:
+                while unwritten:
+                    (event, day), part_rows = unwritten[0]
+                    self._write_part(event, day, part_rows)
+                    unwritten.pop(0)
+                    self.written += len(part_rows)
+                    self.files += 1
+            except Exception:
+                with self._lock:
+                    newer = list(self._buffer)
+                    self._buffer.clear()
+                    # Ahead of rows recorded meanwhile; maxlen drops the oldest if it's full
+                    self._buffer.extend([row for _, part_rows in unwritten for row in part_rows] + newer)
+                raise
+
+    def _write_part(self, event, day, rows):
+        folder = os.path.join(self.root, f"event={event}", f"date={day}")
+        os.makedirs(folder, exist_ok=True)
+        name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{next(self._parts)}.{self.fmt}"
+        path = os.path.join(folder, name)
+        # Written under a temporary name so readers never see half a file
+        try:
+            if self.fmt == "parquet":
+                _write_parquet(path + ".tmp", rows)
+            else:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            os.replace(path + ".tmp", path)
+        except Exception:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+            raise
+
+    def _writer(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def stats(self):
+        """Write counts for the admin panel"""
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "root": self.root or None,
+            "format": self.fmt,
+            "recorded": self.recorded,
+            "written": self.written,
+            "buffered": buffered,
+            "files": self.files,
+            "last_error": self.last_error,
+        }
+
+
+def _write_parquet(path, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+    columns = {}
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        # Lists (the groups a teacher listed) are kept as JSON text
+        columns[field] = [json.dumps(value) if isinstance(value, (list, dict)) else value for value in values]
+    pq.write_table(pa.table(columns), path)
+
+
+# ============================================
+# READING AND QUERIES
+# ============================================
+
+def load(root, event):
+    """All rows of one event as a DataFrame (both Parquet and JSONL parts)"""
+    import pandas as pd
+
+    frames = []
+    for path in sorted(glob.glob(os.path.join(root, f"event={event}", "date=*", "part-*"))):
+        if path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path))
+        elif path.endswith(".jsonl"):
+            frames.append(pd.read_json(path, lines=True, dtype=False))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _normalize(values):
+    return values.dropna().astype(str).str.strip().str.lower().replace("", None).dropna()
+
+
+def top_values(plans, field, limit=10):
+    """Most common values of a plan field, case- and whitespace-insensitive"""
+    if plans.empty or field not in plans:
+        return []
+    counts = _normalize(plans[field]).value_counts().head(limit)
+    return [{field: value, "plans": int(n), "share": round(n / len(plans), 3)} for value, n in counts.items()]
+
+
+def price_summary(calculator):
+    """Median price per student by currency, over each teacher's latest calculator inputs"""
+    if calculator.empty:
+        return []
+    latest = calculator.sort_values("ts").groupby("analytics_id").tail(1)
+    rows = []
+    for currency, group in latest.groupby("currency"):
+        prices = group["price_per_student"].astype(float)
+        rows.append({
+            "currency": currency,
+            "teachers": len(group),
+            "median_price_per_student": round(float(prices.median()), 2),
+            "p25": round(float(prices.quantile(0.25)), 2),
+            "p75": round(float(prices.quantile(0.75)), 2),
+            "median_net_income": round(float(group["net_income"].astype(float).median()), 2),
+        })
+    return rows
+
+
+def _print_rows(title, rows):
+    print(title)
+    if not rows:
+        print("  (no data)")
+        return
+    fields = list(rows[0])
+    widths = {field: max(len(field), *(len(f"{row[field]}") for row in rows)) for field in fields}
+    print("  " + "  ".join(f"{field:<{widths[field]}}" for field in fields))
+    for row in rows:
+        print("  " + "  ".join(f"{row[field]!s:<{widths[field]}}" for field in fields))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("query", choices=["groups", "formats", "price", "summary"])
+    parser.add_argument("--root", default="analytics", help="analytics directory")
+    parser.add_argument("--limit", type=int, default=10, help="rows to show for top lists")
+    args = parser.parse_args(argv)
+
+    plans = load(args.root, "plan_completed")
+    if args.query in ("groups", "summary"):
+        _print_rows(f"Most common selected groups ({len(plans)} plans)", top_values(plans, "selected_group", args.limit))
+    if args.query in ("formats", "summary"):
+        _print_rows("Most common offering formats", top_values(plans, "format_pref", args.limit))
+    if args.query in ("price", "summary"):
+        _print_rows("Price per student (latest calculator inputs per teacher)",
+                    price_summary(load(args.root, "calculator")))
+
+
+if __name__ == "__main__":
+    main()
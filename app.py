@@ -1,7 +1,32 @@
 import streamlit as st
-import anthropic
 from datetime import datetime
 import json
+import time
+import uuid
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+# anthropic is only imported once the niche finder builds its client, and
+# numpy/pandas/altair only on the calculator page (benchmarks/profile_startup.py)
+from analytics import AnalyticsWriter, CALCULATOR_FIELDS, PLAN_FIELDS
+from claude_client import SharedClient, usage_summary
+from offerings import (
+    in_tier_order, offering_lines, offering_text, offerings_text, record_offering_tool,
+    validate_offering, TIERS
+)
+from prefetch import Prefetcher
+from prompts import (
+    build_niche_statement, build_request, fit_history, fold_old_turns, relevant_responses,
+    group_insight_prompt, narrow_ideas_prompt, niche_first_look_prompt, offering_prompt,
+    viability_prompt, CONTEXT_TOKEN_BUDGET, SYSTEM_PROMPTS
+)
+from response_cache import ResponseCache
+from routing import Router
+from semantic_cache import SemanticCache
+from session_memory import state_sizes, SessionRegistry
+from session_store import SessionStore
+from telemetry import Telemetry
 
 # ============================================
 # INITIAL SETUP
@@ -23,10 +48,165 @@ if 'responses' not in st.session_state:
     st.session_state.responses = {}
 if 'conversation' not in st.session_state:
     st.session_state.conversation = []
+if 'conversation_summary' not in st.session_state:
+    st.session_state.conversation_summary = []
 if 'niche_statement' not in st.session_state:
     st.session_state.niche_statement = ""
 if 'groups' not in st.session_state:
     st.session_state.groups = []
+if 'ai_replies' not in st.session_state:
+    st.session_state.ai_replies = {}
+if 'analytics_id' not in st.session_state:
+    st.session_state.analytics_id = uuid.uuid4().hex
+
+# The home page and calculator work without a secrets.toml; only the niche finder needs the API key
+def secret(name, default=None):
+    """st.secrets.get that falls back to default when there are no secrets at all"""
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
+
+# Shared across all sessions so repeated prompts don't go back to the API
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache(
+        max_entries=int(secret("RESPONSE_CACHE_SIZE", 512)),
+        ttl_seconds=int(secret("RESPONSE_CACHE_TTL", 6 * 60 * 60)),
+        db_path=secret("RESPONSE_CACHE_DB") or None
+    )
+
+# Replies for near-duplicate prompts (e.g. the same group typed differently), shared by all sessions
+@st.cache_resource
+def get_semantic_cache():
+    return SemanticCache(
+        threshold=float(secret("SEMANTIC_CACHE_THRESHOLD", 0.8)),
+        max_entries=int(secret("SEMANTIC_CACHE_SIZE", 2000)),
+        ttl_seconds=int(secret("SEMANTIC_CACHE_TTL", secret("RESPONSE_CACHE_TTL", 6 * 60 * 60)))
+    )
+
+# One Anthropic client per process so sessions share pooled keep-alive connections
+@st.cache_resource
+def get_shared_client():
+    return SharedClient(
+        api_key=st.secrets["ANTHROPIC_API_KEY"],
+        timeout=float(secret("ANTHROPIC_TIMEOUT", 60)),
+        connect_timeout=float(secret("ANTHROPIC_CONNECT_TIMEOUT", 5)),
+        max_connections=int(secret("ANTHROPIC_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(secret("ANTHROPIC_KEEPALIVE_CONNECTIONS", 10)),
+        keepalive_expiry=float(secret("ANTHROPIC_KEEPALIVE_EXPIRY", 30)),
+        base_url=secret("ANTHROPIC_BASE_URL") or None,
+        requests_per_minute=float(secret("ANTHROPIC_REQUESTS_PER_MINUTE", 50)),
+        burst=int(secret("ANTHROPIC_BURST", 5)),
+        max_retries=int(secret("ANTHROPIC_MAX_RETRIES", 4)),
+        backoff_base=float(secret("ANTHROPIC_BACKOFF_BASE", 1)),
+        backoff_cap=float(secret("ANTHROPIC_BACKOFF_CAP", 30))
+    )
+
+# Model, max_tokens and latency budget per task (set MODEL_TIERS.fast; ROUTES overrides the defaults)
+@st.cache_resource
+def get_router():
+    return Router(routes=secret("ROUTES"), models=secret("MODEL_TIERS"))
+
+# Per-call latency/token records, written to a rotating JSONL file
+@st.cache_resource
+def get_telemetry():
+    return Telemetry(
+        path=secret("TELEMETRY_PATH", "llm_calls.jsonl"),
+        max_bytes=int(secret("TELEMETRY_MAX_BYTES", 5 * 1024 * 1024)),
+        backup_count=int(secret("TELEMETRY_BACKUPS", 5))
+    )
+
+# Thread pool for background AI calls, shared by all sessions
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=int(secret("PREFETCH_WORKERS", 8)),
+        thread_name_prefix="prefetch"
+    )
+
+# Saved progress, so a refresh, reconnect or restart doesn't lose the flow
+@st.cache_resource
+def get_session_store():
+    return SessionStore(
+        db_path=secret("SESSION_DB", "sessions.sqlite3") or None,
+        flush_interval=float(secret("SESSION_FLUSH_SECONDS", 1)),
+        ttl_seconds=int(secret("SESSION_TTL", 30 * 24 * 60 * 60))
+    )
+
+# Completed plans and calculator inputs, appended to a partitioned store in the background
+@st.cache_resource
+def get_analytics():
+    return AnalyticsWriter(
+        root=secret("ANALYTICS_DIR", "analytics"),
+        fmt=secret("ANALYTICS_FORMAT", "parquet"),
+        flush_interval=float(secret("ANALYTICS_FLUSH_SECONDS", 5))
+    )
+
+# Session-state size of every live session, for the admin panel
+@st.cache_resource
+def get_session_registry():
+    return SessionRegistry(idle_seconds=int(secret("SESSION_IDLE_SECONDS", 60 * 60)))
+
+# Admin panel is only shown with ?admin=<ADMIN_TOKEN> in the URL
+def is_admin():
+    token = secret("ADMIN_TOKEN")
+    return bool(token) and st.query_params.get("admin") == token
+
+# ============================================
+# SESSION PERSISTENCE
+# ============================================
+
+# Everything needed to pick the flow back up. ai_replies (cache key -> reply)
+# goes back into the response cache on restore, so re-rendering a stage
+# makes no API calls.
+PERSISTED_KEYS = [
+    'page', 'stage', 'responses', 'conversation', 'conversation_summary', 'niche_statement', 'groups',
+    'ai_replies', 'analytics_id'
+]
+MAX_SAVED_REPLIES = 20
+
+# Per-session memory budgets (bytes) for the stored history and saved replies
+HISTORY_BYTES = int(secret("SESSION_HISTORY_BYTES", 16 * 1024))
+REPLIES_BYTES = int(secret("SESSION_REPLIES_BYTES", 32 * 1024))
+
+def checkpoint():
+    """Queue this session's progress for saving (skipped if nothing changed)"""
+    get_session_store().save(
+        st.session_state.resume_token,
+        {key: st.session_state[key] for key in PERSISTED_KEYS}
+    )
+
+# First run of a browser session: restore from ?resume=<token>, or start a new token
+if 'resume_token' not in st.session_state:
+    token = st.query_params.get("resume")
+    saved = get_session_store().load(token) if token else None
+    if saved is None:
+        token = SessionStore.new_token()
+    else:
+        for key in PERSISTED_KEYS:
+            if key in saved:
+                st.session_state[key] = saved[key]
+        for cache_key, reply in st.session_state.ai_replies.items():
+            get_response_cache().set(cache_key, reply)
+    st.session_state.resume_token = token
+    st.query_params["resume"] = token
+
+def track_memory():
+    """Report this session's state size to the registry behind the admin panel"""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_registry().update(
+            ctx.session_id, state_sizes(st.session_state.to_dict()),
+            page=st.session_state.page, stage=st.session_state.stage
+        )
+
+def is_live_session(session_id):
+    runtime = Runtime.instance() if Runtime.exists() else None
+    return runtime is None or runtime.is_active_session(session_id)
+
+# Buttons end their run with st.rerun(), so saving here catches their changes
+checkpoint()
 
 # Custom CSS with Tergar brand colors
 st.markdown("""
@@ -166,8 +346,16 @@ elif st.session_state.page == 'niche':
         st.session_state.page = 'home'
         st.rerun()
     
-    # Initialize Claude
-    client = anthropic.Anthropic(api_key=st.secrets["ANTHROPIC_API_KEY"])
+    # Shared Claude client (created once per process)
+    shared_client = get_shared_client()
+    client = shared_client.client
+    response_cache = get_response_cache()
+    semantic_cache = get_semantic_cache()
+    telemetry = get_telemetry()
+    router = get_router()
+    if 'prefetcher' not in st.session_state:
+        st.session_state.prefetcher = Prefetcher(get_executor())
+    prefetcher = st.session_state.prefetcher
     
     # Title
     st.title("🎯 Find Your Meditation Teaching Niche")
@@ -182,46 +370,354 @@ elif st.session_state.page == 'niche':
         st.progress(progress)
         st.caption(f"Step {current_index} of {len(stages)-1}: {stage_names[current_index]}")
 
-    # Helper function to talk to Claude
-    def ask_claude(prompt, context=""):
-        """Talk to Claude and get a response"""
+    # Helpers to talk to Claude
+    def build_claude_request(prompt, context="", task="chat", stage=None, history=True, tool=None, shared=False,
+                             answers=None):
+        """Build the API request, its cache key and telemetry labels from the current session
+
+        The task's route sets the model and max_tokens. stage overrides which
+        stage's answers are sent, and answers adds ones not saved yet;
+        history=False leaves the conversation out, for calls that only need
+        the collected answers. shared=True leaves out both, so the reply suits
+        any user and can be served to other sessions.
+        """
+        route = router.route(task)
+        stage = stage or st.session_state.stage
+        history = history and not shared
+        responses = {} if shared else {**st.session_state.responses, **(answers or {})}
+        cache_key = claude_cache_key(prompt, context, stage, tool, task, shared, answers)
+        
+        # Stable instructions go in the system block, session state after it
+        request = build_request(
+            route["model"], route["max_tokens"], prompt, context, stage, responses,
+            st.session_state.conversation if history else [],
+            st.session_state.conversation_summary if history else [],
+            token_budget=int(secret("CONTEXT_TOKEN_BUDGET", CONTEXT_TOKEN_BUDGET)),
+            tool=tool,
+            system=SYSTEM_PROMPTS[route["system"]]
+        )
+        labels = {"task": task, "stage": stage, "model": route["model"], "tier": route["tier"],
+                  "latency_budget": route["latency_budget"]}
+        return cache_key, request, labels
+
+    def claude_cache_key(prompt, context="", stage=None, tool=None, task="chat", shared=False, answers=None):
+        """History is left out of the key so a rerun asking the same question hits the cache"""
+        stage = stage or st.session_state.stage
+        responses = {} if shared else relevant_responses(stage, {**st.session_state.responses, **(answers or {})})
+        route = router.route(task)
+        return response_cache.make_key(
+            route["model"], prompt,
+            [SYSTEM_PROMPTS[route["system"]], context, stage, responses,
+             tool["name"] if tool else ""]
+        )
+
+    def call_claude(request, cache_key, labels):
+        """Send a built request and cache the reply text.
+
+        Doesn't touch session state, so it can run on a background thread.
+        """
+        started = time.perf_counter()
         try:
-            # Build conversation history (last 5 messages)
-            history = "\n".join([f"{msg['role']}: {msg['content']}" for msg in st.session_state.conversation[-5:]])
-            
-            # Create the full context for Claude
-            full_context = f"""You are helping a meditation teacher find their specific teaching niche. 
-            
-    Previous conversation:
-    {history}
+            # Call Claude API (rate limited, retried, and shared with identical calls in flight)
+            message, leader = shared_client.create(request, key=cache_key)
+        except Exception as e:
+            record_failure(labels, started, e)
+            raise
+        
+        wall = time.perf_counter() - started
+        response = message.content[0].text
+        if not leader:
+            telemetry.record(**labels, outcome="coalesced", wall_seconds=round(wall, 3))
+            return response
+        record_success(labels, False, wall, wall, usage_summary(message.usage))
+        response_cache.set(cache_key, response)
+        return response
 
-    Current stage: {st.session_state.stage}
-    User data collected: {json.dumps(st.session_state.responses, indent=2)}
+    def stream_tool(request, cache_key, labels, validate):
+        """Stream a built tool request: yields the tool input as it is parsed, ending with all of it.
 
-    {context}
+        Only input that passes validate() is cached. Doesn't touch session
+        state, so it can run on a background thread.
+        """
+        def on_success(data, usage, ttft, wall):
+            # Runs on the stream's own thread, even if this script run was interrupted
+            try:
+                validate(data)
+            except ValueError as e:
+                telemetry.record(**labels, outcome="invalid", stream=True, wall_seconds=round(wall, 3),
+                                 error=str(e), **usage)
+                return
+            record_success(labels, True, wall, ttft, usage)
+            response_cache.set(cache_key, json.dumps(data))
+
+        started = time.perf_counter()
+        try:
+            stream, leader = shared_client.stream(request, key=cache_key, on_success=on_success)
+            yield from stream
+        except Exception as e:
+            record_failure(labels, started, e)
+            raise
+        
+        if not leader:
+            telemetry.record(**labels, outcome="coalesced", stream=True,
+                             wall_seconds=round(time.perf_counter() - started, 3))
+
+    def ask_claude_tool(prompt, tool, validate, as_text, task, stage=None, history=True):
+        """Stream a structured reply: yields the tool input as it is parsed, ending with all of it.
+
+        Only input that passes validate() is cached and saved to the
+        conversation (as as_text() of it); API errors are raised for the
+        caller to show.
+        """
+        cache_key, request, labels = build_claude_request(prompt, task=task, stage=stage, history=history, tool=tool)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            telemetry.record(**labels, outcome="cache_hit")
+            data = json.loads(cached)
+            remember_exchange(prompt, as_text(validate(data)), cache_key, reply=cached)
+            yield data
+            return
+        
+        snapshot = None
+        for snapshot in stream_tool(request, cache_key, labels, validate):
+            yield snapshot
+        try:
+            data = validate(snapshot)
+        except ValueError:
+            return
+        remember_exchange(prompt, as_text(data), cache_key, reply=json.dumps(data))
 
-    Respond conversationally and guide them based on the current stage."""
+    def record_success(labels, stream, wall, ttft, usage):
+        """Telemetry for a completed call, flagged when it took longer than its route allows"""
+        telemetry.record(**labels, outcome="ok", stream=stream, wall_seconds=round(wall, 3),
+                         ttft_seconds=round(ttft, 3), over_budget=wall > labels["latency_budget"], **usage)
 
-            # Call Claude API
-            message = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"{full_context}\n\nUser input: {prompt}"
-                    }
-                ]
+    def record_failure(labels, started, error):
+        telemetry.record(**labels, outcome="error", wall_seconds=round(time.perf_counter() - started, 3),
+                         error=f"{type(error).__name__}: {error}")
+
+    def error_message(error):
+        if getattr(error, "status_code", None) == 429:
+            return "The AI is very busy right now. Please wait a minute and try again."
+        return f"Error connecting to AI: {str(error)}"
+
+    def remember_exchange(prompt, response, cache_key, reply=None):
+        """Save to conversation history (once, even if reruns repeat the question)
+
+        reply is what a resumed session gets back from the cache, if that
+        isn't the response text itself (structured replies are kept as JSON).
+        A page can show several replies on every rerun, so an exchange is
+        known by its cache key, not by being the last one in the history.
+        """
+        if cache_key not in st.session_state.ai_replies:
+            st.session_state.conversation.extend(
+                [{"role": "user", "content": prompt}, {"role": "assistant", "content": response}]
             )
-            response = message.content[0].text
-            
-            # Save to conversation history
-            st.session_state.conversation.append({"role": "user", "content": prompt})
-            st.session_state.conversation.append({"role": "assistant", "content": response})
-            
+            fold_old_turns(st.session_state.conversation, st.session_state.conversation_summary)
+            fit_history(st.session_state.conversation, st.session_state.conversation_summary, HISTORY_BYTES)
+        # Kept with the saved session so a resumed one gets it from the cache
+        replies = st.session_state.ai_replies
+        replies.pop(cache_key, None)
+        replies[cache_key] = response if reply is None else reply
+        while len(replies) > MAX_SAVED_REPLIES or (
+            len(replies) > 1 and sum(len(reply.encode('utf-8')) for reply in replies.values()) > REPLIES_BYTES
+        ):
+            del replies[next(iter(replies))]
+
+    # Speculative calls for the next stage, run while the user is still on this one
+    def prefetch_claude(name, key, prompt, stage, answers=None):
+        """Start a Claude call in the background for a later stage to pick up
+
+        stage is the stage that will show the reply and answers what it will
+        have saved by then, so the request and its cache key are the ones
+        that stage would build.
+        """
+        cache_key, request, labels = build_claude_request(prompt, task=name, stage=stage, answers=answers)
+        prefetcher.submit(name, key, fetch_claude, request, cache_key, labels)
+
+    def fetch_claude(request, cache_key, labels, near=None):
+        """Cached reply if there is one, else call Claude (background-safe)
+
+        near is (namespace, text) to file a fresh reply under in the
+        near-duplicate cache.
+        """
+        response = response_cache.get(cache_key)
+        if response is not None:
+            telemetry.record(**labels, outcome="cache_hit")
             return response
+        response = call_claude(request, cache_key, labels)
+        if near is not None:
+            semantic_cache.set(*near, response)
+        return response
+
+    def prefetched_claude(name, key, prompt, waiting=None):
+        """Return a prefetched reply if it's ready (or already cached), else None
+
+        With waiting, a reply still on its way shows that placeholder and
+        fills itself in when it lands, like background_claude.
+        """
+        cache_key = claude_cache_key(prompt, task=name)
+        response = prefetcher.result(name, key)
+        if response is None and not prefetcher.pending(name, key):
+            # e.g. a resumed session, whose new prefetcher never ran this
+            response = response_cache.get(cache_key)
+        if response is not None:
+            remember_exchange(prompt, response, cache_key)
+        elif waiting and prefetcher.pending(name, key):
+            poll_claude(name, key, waiting)
+        return response
+
+    # Non-blocking calls: the page renders straight away and a poll fills the reply in
+    def background_claude(name, key, prompt, waiting="Thinking...", similar=None):
+        """Ask Claude without blocking: returns None (and shows a placeholder) until the reply is ready.
+
+        The call runs on the shared executor, so the thread serving this
+        session never waits on the network; a small fragment polls it and
+        reruns the page once it lands.
+
+        With similar (the text that decides the answer, e.g. the group), the
+        request is shared (no personal context) and a reply already given
+        for a near-duplicate of that text, in any session, is used instead.
+        """
+        cache_key, request, labels = build_claude_request(prompt, task=name, shared=similar is not None)
+        near = (f"{name}:{labels['model']}", similar) if similar is not None else None
+        response = response_cache.get(cache_key)
+        if response is not None:
+            telemetry.record(**labels, outcome="cache_hit")
+        elif near is not None and not prefetcher.pending(name, key):
+            match = semantic_cache.get(*near)
+            if match is not None:
+                response, similarity, matched = match
+                telemetry.record(**labels, outcome="near_hit", similarity=round(similarity, 3), matched=matched)
+                # Later reruns of this session then hit the exact cache
+                response_cache.set(cache_key, response)
+        if response is None:
+            prefetcher.submit(name, key, fetch_claude, request, cache_key, labels, near)
+            error = prefetcher.error(name, key)
+            if error is not None:
+                # Dropped, so the next rerun tries again
+                prefetcher.cancel(name)
+                return error_message(error)
+            response = prefetcher.result(name, key)
+        if response is None:
+            poll_claude(name, key, waiting)
+            return None
+        remember_exchange(prompt, response, cache_key)
+        return response
+
+    @st.fragment(run_every=float(secret("AI_POLL_SECONDS", 0.5)))
+    def poll_claude(name, key, waiting):
+        if prefetcher.pending(name, key):
+            st.caption(f"⏳ {waiting}")
+        elif get_script_run_ctx().fragment_ids_this_run:
+            # Only from the poll's own run: in a full run, rerunning would drop a button click
+            st.rerun()
+
+    # Offerings are structured data, rendered here and turned into text for the download
+    def show_offering(offering):
+        """One offering; fields still being written are simply left out"""
+        st.markdown(f"#### {TIERS.get(offering.get('tier'), 'Offering')}: {offering.get('name', '...')}")
+        for label, text in offering_lines(offering):
+            st.markdown(f"**{label}:** {text}")
+
+    def offering_error(error):
+        if isinstance(error, ValueError):
+            return "That offering came back incomplete. Please try again."
+        return error_message(error)
+
+    def stream_offering(request, cache_key, labels, tier, updates):
+        """Cached offering for one tier, else stream it, putting (tier, snapshot) on updates (background-safe)"""
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            telemetry.record(**labels, outcome="cache_hit")
+            return validate_offering(json.loads(cached), tier)
+        snapshot = None
+        for snapshot in stream_tool(request, cache_key, labels, lambda data: validate_offering(data, tier)):
+            updates.put((tier, snapshot))
+        return validate_offering(snapshot, tier)
+
+    def generate_offerings(availability, format_pref, location):
+        """Write the three offerings at once, one streamed call per tier, filling each card as it is written.
+
+        The calls share everything but the tier, run on the shared executor
+        and are merged in tier order. Returns (offerings, {tier: error}); a
+        tier that fails leaves the other two in place.
+        """
+        futures = {}
+        cards = {}
+        # Snapshots from the streams, plus None whenever a call finishes
+        updates = Queue()
+        for tier, label in TIERS.items():
+            prompt = offering_prompt(st.session_state.niche_statement, tier, availability, format_pref, location)
+            cache_key, request, labels = build_claude_request(prompt, task="offering", tool=record_offering_tool(tier))
+            future = prefetcher.submit(f"offering_{tier}", cache_key, stream_offering,
+                                       request, cache_key, labels, tier, updates)
+            future.add_done_callback(lambda future: updates.put(None))
+            futures[future] = (tier, prompt, cache_key)
+            cards[tier] = st.empty()
+            cards[tier].caption(f"⏳ Writing your {label} offering...")
+        
+        offerings, errors = [], {}
+        pending = set(futures)
+        while pending:
+            # Draw only the latest snapshot of each tier that is still being written
+            latest = {}
+            item = updates.get()
+            while True:
+                if item is not None:
+                    latest[item[0]] = item[1]
+                try:
+                    item = updates.get_nowait()
+                except Empty:
+                    break
+            done = {future for future in pending if future.done()}
+            pending -= done
+            for future in pending:
+                tier = futures[future][0]
+                if tier in latest:
+                    with cards[tier].container():
+                        show_offering({**latest[tier], 'tier': tier})
+            for future in done:
+                tier, prompt, cache_key = futures[future]
+                prefetcher.cancel(f"offering_{tier}")
+                error = future.exception() if not future.cancelled() else RuntimeError("cancelled")
+                if error is not None:
+                    errors[tier] = error
+                    cards[tier].warning(f"{TIERS[tier]}: {offering_error(error)}")
+                    continue
+                offering = future.result()
+                offerings.append(offering)
+                remember_exchange(prompt, offering_text(offering), cache_key, reply=json.dumps(offering))
+                with cards[tier].container():
+                    show_offering(offering)
+        return in_tier_order(offerings), errors
+
+    def regenerate_offering(tier, card):
+        """Redo one offering, sending only that tier, the preferences and the other names"""
+        responses = st.session_state.responses
+        offerings = responses['offerings_data']
+        current = next((offering for offering in offerings if offering['tier'] == tier), None)
+        others = [offering['name'] for offering in offerings if offering is not current]
+        prompt = offering_prompt(
+            st.session_state.niche_statement, tier, responses.get('availability', ''),
+            responses.get('format_pref', ''), responses.get('location', ''),
+            current['name'] if current else None, others
+        )
+        snapshot = None
+        try:
+            for snapshot in ask_claude_tool(
+                prompt, record_offering_tool(tier), lambda data: validate_offering(data, tier), offering_text,
+                task="offering_regenerate", stage='offerings', history=False
+            ):
+                with card.container():
+                    show_offering({**snapshot, 'tier': tier})
+            offering = validate_offering(snapshot, tier)
         except Exception as e:
-            return f"Error connecting to AI: {str(e)}"
+            st.error(offering_error(e))
+            return
+        responses['offerings_data'] = in_tier_order(offerings + [offering])
+        responses['offerings'] = offerings_text(responses['offerings_data'])
+        st.rerun()
 
     # STAGE: Welcome
     if st.session_state.stage == 'welcome':
@@ -246,32 +742,37 @@ elif st.session_state.page == 'niche':
         st.header("📖 Your Story")
         st.write("Your most powerful teaching often comes from your own transformation.")
         
-        challenge = st.text_area(
-            "What life challenge led you to meditation?",
-            placeholder="Be specific: Not just 'stress' but 'panic attacks before presentations' or 'couldn't sleep after my divorce'",
-            height=100
-        )
-        
-        transformation = st.text_area(
-            "What transformation did you experience?",
-            placeholder="How is your daily life different now? What specific changes occurred?",
-            height=100
-        )
+        # A form, so typing doesn't rerun the app until they submit
+        with st.form("story_form", border=False):
+            challenge = st.text_area(
+                "What life challenge led you to meditation?",
+                placeholder="Be specific: Not just 'stress' but 'panic attacks before presentations' or 'couldn't sleep after my divorce'",
+                height=100
+            )
+            
+            transformation = st.text_area(
+                "What transformation did you experience?",
+                placeholder="How is your daily life different now? What specific changes occurred?",
+                height=100
+            )
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                back = st.form_submit_button("← Back")
+            with col2:
+                submitted = st.form_submit_button("Continue →", type="primary")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("← Back"):
-                st.session_state.stage = 'welcome'
+        if back:
+            st.session_state.stage = 'welcome'
+            st.rerun()
+        if submitted:
+            if challenge and transformation:
+                st.session_state.responses['challenge'] = challenge
+                st.session_state.responses['transformation'] = transformation
+                st.session_state.stage = 'groups'
                 st.rerun()
-        with col2:
-            if st.button("Continue →", type="primary"):
-                if challenge and transformation:
-                    st.session_state.responses['challenge'] = challenge
-                    st.session_state.responses['transformation'] = transformation
-                    st.session_state.stage = 'groups'
-                    st.rerun()
-                else:
-                    st.error("Please fill in both fields")
+            else:
+                st.error("Please fill in both fields")
 
     # STAGE: Groups You Know
     elif st.session_state.stage == 'groups':
@@ -297,114 +798,146 @@ elif st.session_state.page == 'niche':
         
         # Create 5 input fields for groups
         groups = []
-        for i in range(5):
-            group = st.text_input(
-                f"Group {i+1}" + (" (optional)" if i > 2 else ""),
-                key=f"group_{i}"
-            )
-            if group:
-                groups.append(group)
+        with st.form("groups_form", border=False):
+            for i in range(5):
+                group = st.text_input(
+                    f"Group {i+1}" + (" (optional)" if i > 2 else ""),
+                    key=f"group_{i}"
+                )
+                if group:
+                    groups.append(group)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                back = st.form_submit_button("← Back")
+            with col2:
+                submitted = st.form_submit_button("Continue →", type="primary")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("← Back"):
-                st.session_state.stage = 'story'
+        if back:
+            st.session_state.stage = 'story'
+            st.rerun()
+        if submitted:
+            if len(groups) >= 3:
+                st.session_state.groups = groups
+                st.session_state.responses['groups'] = groups
+                st.session_state.stage = 'select_group'
                 st.rerun()
-        with col2:
-            if st.button("Continue →", type="primary"):
-                if len(groups) >= 3:
-                    st.session_state.groups = groups
-                    st.session_state.responses['groups'] = groups
-                    st.session_state.stage = 'select_group'
-                    st.rerun()
-                else:
-                    st.error("Please list at least 3 groups")
+            else:
+                st.error("Please list at least 3 groups")
 
     # STAGE: Select Your Group
     elif st.session_state.stage == 'select_group':
-        st.header("🎯 Choose Your Focus")
-        st.write("Select the group you'd like to explore further:")
-        
-        selected = st.radio(
-            "Which group do you feel most called to serve?",
-            st.session_state.groups,
-            index=None
-        )
-        
-        if selected:
-            st.info(f"You selected: **{selected}**")
+        # A fragment: picking a group reruns just this stage, not the whole app
+        @st.fragment
+        def select_group_stage():
+            st.header("🎯 Choose Your Focus")
+            st.write("Select the group you'd like to explore further:")
+            
+            selected = st.radio(
+                "Which group do you feel most called to serve?",
+                st.session_state.groups,
+                index=None
+            )
             
-            # Ask Claude for insight about this choice
-            with st.spinner("Getting insights..."):
-                insight = ask_claude(
-                    f"The user wants to focus on helping '{selected}'. Ask one brief, conversational follow-up question to understand why they connect with this group. Keep it under 2 sentences."
+            if selected:
+                st.info(f"You selected: **{selected}**")
+                
+                # Get the next stage's ideas going while they read and decide
+                prefetch_claude('narrow_ideas', selected, narrow_ideas_prompt(selected), 'narrow',
+                                {'selected_group': selected})
+                
+                # Ask Claude for insight about this choice, without holding up the page
+                insight = background_claude(
+                    'group_insight', selected, group_insight_prompt(selected), waiting="Getting insights...",
+                    similar=selected
                 )
-            st.write(insight)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("← Back"):
-                st.session_state.stage = 'groups'
-                st.rerun()
-        with col2:
-            if st.button("Continue →", type="primary"):
-                if selected:
-                    st.session_state.responses['selected_group'] = selected
-                    st.session_state.stage = 'narrow'
+                if insight:
+                    st.write(insight)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("← Back"):
+                    st.session_state.stage = 'groups'
                     st.rerun()
-                else:
-                    st.error("Please select a group")
+            with col2:
+                if st.button("Continue →", type="primary"):
+                    if selected:
+                        st.session_state.responses['selected_group'] = selected
+                        st.session_state.stage = 'narrow'
+                        st.rerun()
+                    else:
+                        st.error("Please select a group")
+        
+        select_group_stage()
 
     # STAGE: Narrow Your Niche
     elif st.session_state.stage == 'narrow':
-        st.header("🔍 Let's Get Specific")
-        
-        selected_group = st.session_state.responses['selected_group']
-        st.write(f"You want to help: **{selected_group}**")
-        st.write("Now let's make this more specific.")
-        
-        specific_struggle = st.text_area(
-            "What specific struggle does this group face?",
-            placeholder="Not just 'stress' but the specific flavor of their struggle",
-            height=80
-        )
-        
-        acute_moment = st.text_area(
-            "When is this struggle most acute?",
-            placeholder="Specific moments, times, or situations when they most need help",
-            height=80
-        )
-        
-        specific_who = st.text_area(
-            "Can you be even more specific about WHO in this group?",
-            placeholder=f"Add details that narrow '{selected_group}' further (age, stage, situation, etc.)",
-            height=80
-        )
-        
-        # Show emerging niche statement if fields are filled
-        if specific_struggle and acute_moment:
-            who = specific_who if specific_who else selected_group
-            niche = f"I help {who} who struggle with {specific_struggle}, especially {acute_moment}"
+        # A fragment, so editing the answers (and the live niche preview) reruns just this stage
+        @st.fragment
+        def narrow_stage():
+            st.header("🔍 Let's Get Specific")
             
-            st.success("**Your emerging niche:**")
-            st.write(niche)
-            st.session_state.niche_statement = niche
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("← Back"):
-                st.session_state.stage = 'select_group'
-                st.rerun()
-        with col2:
-            if st.button("Continue →", type="primary"):
-                if specific_struggle and acute_moment:
-                    st.session_state.responses['specific_struggle'] = specific_struggle
-                    st.session_state.responses['acute_moment'] = acute_moment
-                    st.session_state.responses['specific_who'] = specific_who
-                    st.session_state.stage = 'test'
+            selected_group = st.session_state.responses['selected_group']
+            st.write(f"You want to help: **{selected_group}**")
+            st.write("Now let's make this more specific.")
+            
+            # Ideas prefetched while they were choosing their group
+            prefetch_claude('narrow_ideas', selected_group, narrow_ideas_prompt(selected_group), 'narrow')
+            with st.expander("💡 Need ideas?"):
+                ideas = prefetched_claude('narrow_ideas', selected_group, narrow_ideas_prompt(selected_group),
+                                          waiting="Ideas for this group are still on their way...")
+                if ideas:
+                    st.write(ideas)
+            
+            specific_struggle = st.text_area(
+                "What specific struggle does this group face?",
+                placeholder="Not just 'stress' but the specific flavor of their struggle",
+                height=80
+            )
+            
+            acute_moment = st.text_area(
+                "When is this struggle most acute?",
+                placeholder="Specific moments, times, or situations when they most need help",
+                height=80
+            )
+            
+            specific_who = st.text_area(
+                "Can you be even more specific about WHO in this group?",
+                placeholder=f"Add details that narrow '{selected_group}' further (age, stage, situation, etc.)",
+                height=80
+            )
+            
+            # Show emerging niche statement if fields are filled
+            if specific_struggle and acute_moment:
+                niche = build_niche_statement(selected_group, specific_struggle, acute_moment, specific_who)
+                
+                st.success("**Your emerging niche:**")
+                st.write(niche)
+                st.session_state.niche_statement = niche
+                
+                # Start the viability read now; a changed niche cancels the old one
+                prefetch_claude('niche_first_look', niche, niche_first_look_prompt(niche), 'test', {
+                    'specific_struggle': specific_struggle, 'acute_moment': acute_moment,
+                    'specific_who': specific_who
+                })
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("← Back"):
+                    st.session_state.stage = 'select_group'
                     st.rerun()
-                else:
-                    st.error("Please fill in at least the first two fields")
+            with col2:
+                if st.button("Continue →", type="primary"):
+                    if specific_struggle and acute_moment:
+                        st.session_state.responses['specific_struggle'] = specific_struggle
+                        st.session_state.responses['acute_moment'] = acute_moment
+                        st.session_state.responses['specific_who'] = specific_who
+                        st.session_state.stage = 'test'
+                        st.rerun()
+                    else:
+                        st.error("Please fill in at least the first two fields")
+        
+        narrow_stage()
 
     # STAGE: Test Your Niche
     elif st.session_state.stage == 'test':
@@ -412,55 +945,70 @@ elif st.session_state.page == 'niche':
         
         st.success(f"**Your niche:** {st.session_state.niche_statement}")
         
+        # First read prefetched while they were finishing the last stage
+        niche = st.session_state.niche_statement
+        first_look = prefetched_claude('niche_first_look', niche, niche_first_look_prompt(niche),
+                                       waiting="Taking a first look at your niche...")
+        if first_look:
+            st.write(first_look)
+        
         st.write("Let's make sure this niche is viable:")
         
-        # Size check
-        size_check = st.radio(
-            "Can you think of at least 50 people who fit this description?",
-            ["Yes - I can name 50+ people",
-             "No - fewer than 50 people", 
-             "Too broad - millions would fit"],
-            index=None
-        )
+        # Feedback is asked for once both answers are submitted, not on every edit
+        with st.form("test_form", border=False):
+            # Size check
+            size_check = st.radio(
+                "Can you think of at least 50 people who fit this description?",
+                ["Yes - I can name 50+ people",
+                 "No - fewer than 50 people", 
+                 "Too broad - millions would fit"],
+                index=None
+            )
+            
+            # Recognition test
+            recognition = st.text_area(
+                "Write one sentence that would make someone in your niche say 'That's exactly me!'",
+                placeholder="Example: 'Do you lie awake at 3am replaying every conversation from work?'",
+                height=80
+            )
+            
+            checked = st.form_submit_button("Get Feedback")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                back = st.form_submit_button("← Back")
+            with col2:
+                submitted = st.form_submit_button("Continue →", type="primary")
         
-        # Recognition test
-        recognition = st.text_area(
-            "Write one sentence that would make someone in your niche say 'That's exactly me!'",
-            placeholder="Example: 'Do you lie awake at 3am replaying every conversation from work?'",
-            height=80
-        )
+        if back:
+            st.session_state.stage = 'narrow'
+            st.rerun()
+        if (checked or submitted) and not (size_check and recognition):
+            st.error("Please complete both questions")
         
-        # Get Claude's feedback if both are filled
+        # Get Claude's feedback once both are submitted (form values only change on submit)
         if size_check and recognition:
-            with st.spinner("Analyzing your niche..."):
-                feedback = ask_claude(
-                    f"Analyze this niche: '{st.session_state.niche_statement}'. Size assessment: {size_check}. Recognition phrase: {recognition}. Give brief, encouraging feedback on whether this niche is well-defined and viable."
-                )
-            
             st.info("**AI Feedback:**")
-            st.write(feedback)
+            feedback = background_claude(
+                'viability_feedback', (niche, size_check, recognition),
+                viability_prompt(niche, size_check, recognition),
+                waiting="Reviewing your niche..."
+            )
+            if feedback:
+                st.write(feedback)
         
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("← Back"):
-                st.session_state.stage = 'narrow'
+        if submitted and size_check and recognition:
+            st.session_state.responses['size_check'] = size_check
+            st.session_state.responses['recognition'] = recognition
+            
+            # Handle different size scenarios
+            if "fewer than 50" in size_check:
+                st.warning("Your niche might be too narrow. Consider broadening slightly.")
+            elif "millions" in size_check:
+                st.warning("Your niche might be too broad. Consider being more specific.")
+            else:
+                st.session_state.stage = 'offerings'
                 st.rerun()
-        with col2:
-            if st.button("Continue →", type="primary"):
-                if size_check and recognition:
-                    st.session_state.responses['size_check'] = size_check
-                    st.session_state.responses['recognition'] = recognition
-                    
-                    # Handle different size scenarios
-                    if "fewer than 50" in size_check:
-                        st.warning("Your niche might be too narrow. Consider broadening slightly.")
-                    elif "millions" in size_check:
-                        st.warning("Your niche might be too broad. Consider being more specific.")
-                    else:
-                        st.session_state.stage = 'offerings'
-                        st.rerun()
-                else:
-                    st.error("Please complete both questions")
 
     # STAGE: Create Offerings
     elif st.session_state.stage == 'offerings':
@@ -469,45 +1017,51 @@ elif st.session_state.page == 'niche':
         st.write(f"Now let's create offerings for: **{st.session_state.niche_statement}**")
         
         # Collect offering preferences
-        availability = st.text_input(
-            "When are your people most available?",
-            placeholder="e.g., Weekday mornings, Weekend afternoons, Evening after kids' bedtime"
-        )
-        
-        format_pref = st.selectbox(
-            "What format would work best for them?",
-            ["", "6-week series", "Drop-in classes", "Monthly membership", "Weekend workshop", "1-on-1 sessions"],
-            index=0
-        )
-        
-        location = st.text_input(
-            "Where would they feel most comfortable?",
-            placeholder="e.g., Online via Zoom, Local yoga studio, Community center"
-        )
+        with st.form("offerings_form", border=False):
+            availability = st.text_input(
+                "When are your people most available?",
+                placeholder="e.g., Weekday mornings, Weekend afternoons, Evening after kids' bedtime"
+            )
+            
+            format_pref = st.selectbox(
+                "What format would work best for them?",
+                ["", "6-week series", "Drop-in classes", "Monthly membership", "Weekend workshop", "1-on-1 sessions"],
+                index=0
+            )
+            
+            location = st.text_input(
+                "Where would they feel most comfortable?",
+                placeholder="e.g., Online via Zoom, Local yoga studio, Community center"
+            )
+            
+            generate = st.form_submit_button("Generate My Three Offerings", type="primary")
         
         # Generate offerings when all fields are filled
-        if availability and format_pref and location:
-            if st.button("Generate My Three Offerings", type="primary"):
-                with st.spinner("Creating your custom offerings..."):
-                    offerings_prompt = f"""
-                    Create 3 specific offerings for someone who helps: {st.session_state.niche_statement}
-                    
-                    Their availability: {availability}
-                    Preferred format: {format_pref}
-                    Location preference: {location}
-                    
-                    Create:
-                    1. Entry Level - Low commitment, accessible
-                    2. Funded/Sponsored - Who might pay for this group to get help?
-                    3. Premium - Higher touch, funds scholarships
-                    
-                    Be specific and practical. No pricing - they'll use calculator for that.
-                    """
-                    
-                    offerings = ask_claude(offerings_prompt)
-                    st.session_state.responses['offerings'] = offerings
-                    st.session_state.stage = 'complete'
-                    st.rerun()
+        if generate:
+            if availability and format_pref and location:
+                # Each offering is shown as soon as its own call lands
+                st.write("### Your Three Offerings:")
+                offerings, errors = generate_offerings(availability, format_pref, location)
+                if not offerings:
+                    st.error(offering_error(next(iter(errors.values()))))
+                    st.stop()
+                st.session_state.responses['offerings_data'] = offerings
+                st.session_state.responses['offerings'] = offerings_text(offerings)
+                st.session_state.responses['availability'] = availability
+                st.session_state.responses['format_pref'] = format_pref
+                st.session_state.responses['location'] = location
+                st.session_state.stage = 'complete'
+                
+                # Only buffered here; a background thread writes it out
+                plan = {field: st.session_state.responses.get(field) for field in PLAN_FIELDS}
+                plan['niche_statement'] = st.session_state.niche_statement
+                get_analytics().record(
+                    "plan_completed", analytics_id=st.session_state.analytics_id,
+                    groups=st.session_state.groups, **plan
+                )
+                st.rerun()
+            else:
+                st.error("Please fill in all three fields")
         
         col1, col2 = st.columns(2)
         with col1:
@@ -522,7 +1076,25 @@ elif st.session_state.page == 'niche':
         st.success(f"**Your Niche:** {st.session_state.niche_statement}")
         
         st.write("### Your Three Offerings:")
-        st.write(st.session_state.responses.get('offerings', ''))
+        offerings = st.session_state.responses.get('offerings_data')
+        if offerings:
+            by_tier = {offering['tier']: offering for offering in offerings}
+            for tier, label in TIERS.items():
+                with st.container(border=True):
+                    card = st.empty()
+                    with card.container():
+                        if tier in by_tier:
+                            show_offering(by_tier[tier])
+                        else:
+                            # Its call failed when the plan was made; the other two still count
+                            st.markdown(f"#### {label}")
+                            st.warning(f"We couldn't write your {label} offering.")
+                    retry = "🔄 Try a different one" if tier in by_tier else "🔄 Try again"
+                    if st.button(retry, key=f"regenerate_{tier}"):
+                        regenerate_offering(tier, card)
+        else:
+            # Plans made before offerings were structured
+            st.write(st.session_state.responses.get('offerings', ''))
         
         st.write("### Next Steps:")
         st.write("""
@@ -575,11 +1147,14 @@ NEXT STEPS:
         with col3:
             if st.button("🔄 Start Over", type="secondary", key="main_start_over"):
                 # Clear niche-related state
+                prefetcher.cancel_all()
                 st.session_state.stage = 'welcome'
                 st.session_state.responses = {}
                 st.session_state.conversation = []
+                st.session_state.conversation_summary = []
                 st.session_state.niche_statement = ""
                 st.session_state.groups = []
+                st.session_state.ai_replies = {}
                 st.rerun()
 
 # ============================================
@@ -591,6 +1166,12 @@ NEXT STEPS:
 # ============================================
 
 elif st.session_state.page == 'calculator':
+    # Numeric and charting stack, only loaded by people who open the calculator
+    import altair as alt
+    import numpy as np
+    import pandas as pd
+    from income import compute_scalar, goal_seek, simulate, sweep, CURRENCY_DATA, GOAL_LEVERS, LEVERS, METRICS
+    
     # Add home button
     if st.button("🏠 Back to Home", key="home_from_calc"):
         st.session_state.page = 'home'
@@ -603,264 +1184,375 @@ elif st.session_state.page == 'calculator':
     if st.session_state.niche_statement:
         st.info(f"📍 Calculating for: {st.session_state.niche_statement}")
     
-    # Currency selector with data
-    currency_data = {
-        "USD ($)": {"symbol": "$", "min_income": 15000, "side_income": 30000, "full_income": 60000},
-        "EUR (€)": {"symbol": "€", "min_income": 13000, "side_income": 25000, "full_income": 50000},
-        "GBP (£)": {"symbol": "£", "min_income": 11000, "side_income": 22000, "full_income": 45000},
-        "CNY (¥)": {"symbol": "¥", "min_income": 100000, "side_income": 200000, "full_income": 400000},
-        "BRL (R$)": {"symbol": "R$", "min_income": 18000, "side_income": 36000, "full_income": 72000},
-        "MXN ($)": {"symbol": "$", "min_income": 75000, "side_income": 150000, "full_income": 300000},
-        "RUB (₽)": {"symbol": "₽", "min_income": 450000, "side_income": 900000, "full_income": 1800000},
-        "ZAR (R)": {"symbol": "R", "min_income": 120000, "side_income": 240000, "full_income": 480000}
-    }
-    
-    currency = st.selectbox(
-        "Select your currency:",
-        list(currency_data.keys())
-    )
-    
-    currency_info = currency_data[currency]
-    symbol = currency_info["symbol"]
-    
-    # INPUTS SECTION
-    st.markdown("---")
-    col_income, spacer, col_costs = st.columns([5, 1, 5])
-    
-    # INCOME COLUMN
-    with col_income:
-        st.markdown("## 📚 Your Income")
-        
-        st.markdown("### Core Teaching")
-        price_per_student = st.slider(
-            f"Price per student (6-week series) {symbol}", 
-            0, 500, 100, 
-            help="What you charge each student for a complete series"
-        )
-        students_per_series = st.slider(
-            "Students per series", 
-            3, 50, 10,
-            help="Average number of students in each series"
-        )
-        series_per_year = st.slider(
-            "Series per year", 
-            1, 20, 4,
-            help="How many 6-week series you'll run annually"
-        )
-        scholarships = st.slider(
-            "Full scholarships per year", 
-            0, 50, 0,
-            help="Number of students you'll accept for free"
+    # Inputs and results in a fragment: moving a slider reruns only the calculator
+    @st.fragment
+    def calculator_body():
+        # Currency selector
+        currency = st.selectbox(
+            "Select your currency:",
+            list(CURRENCY_DATA.keys())
         )
         
-        st.markdown("### Additional Income")
-        monthly_members = st.slider(
-            "Monthly subscription members", 
-            0, 100, 0,
-            help="Ongoing monthly practice group members"
-        )
-        monthly_price = st.slider(
-            f"Monthly subscription price {symbol}", 
-            0, 100, 30
-        )
-        corporate_workshops = st.slider(
-            "Corporate workshops per year", 
-            0, 52, 0,
-            help="One-off workshops for organizations"
-        )
-        corporate_price = st.slider(
-            f"Price per corporate workshop {symbol}", 
-            500, 10000, 2000, step=500
-        )
-    
-    # COSTS COLUMN
-    with col_costs:
-        st.markdown("## 💸 Your Costs")
-        
-        st.markdown("### Monthly Cash Costs")
-        venue_cost = st.number_input(
-            f"Venue/Zoom {symbol}", 
-            0, 1000, 50,
-            help="Monthly cost for teaching space or video platform"
-        )
-        insurance_cost = st.number_input(
-            f"Insurance {symbol}", 
-            0, 500, 40,
-            help="Monthly liability insurance"
-        )
-        marketing_cost = st.number_input(
-            f"Marketing/Website {symbol}", 
-            0, 500, 30,
-            help="Monthly marketing and website costs"
-        )
+        currency_info = CURRENCY_DATA[currency]
+        symbol = currency_info["symbol"]
         
-        st.markdown("### Time Investment")
-        practice_hours = st.slider(
-            "Personal practice (hours/week)", 
-            0, 20, 7,
-            help="Your own meditation practice time"
-        )
-        education_hours = st.slider(
-            "Continuing education (hours/week)", 
-            0, 10, 2,
-            help="Time spent learning and improving"
-        )
-        time_value = st.slider(
-            f"Your time value ({symbol}/hour)", 
-            10, 100, 30,
-            help="What your time is worth per hour"
-        )
-    
-    # CALCULATIONS
-    series_income = price_per_student * students_per_series * series_per_year
-    subscription_income = monthly_members * monthly_price * 12
-    corporate_income = corporate_workshops * corporate_price
-    scholarship_cost = scholarships * price_per_student
-    total_income = series_income + subscription_income + corporate_income - scholarship_cost
-    
-    monthly_cash_costs = venue_cost + insurance_cost + marketing_cost
-    annual_cash_costs = monthly_cash_costs * 12
-    
-    series_hours = series_per_year * 6 * 1.5
-    monthly_hours = 52 if monthly_members > 0 else 0
-    corporate_hours = corporate_workshops * 2
-    total_teaching_hours = series_hours + monthly_hours + corporate_hours
-    teaching_hours_per_week = total_teaching_hours / 52
-    
-    base_prep = 5
-    series_prep_ratio = max(0.5, 2 - (series_per_year - 1) * 0.2)
-    prep_hours_per_week = base_prep + (teaching_hours_per_week * series_prep_ratio)
-    
-    total_hours_per_week = teaching_hours_per_week + prep_hours_per_week + practice_hours + education_hours
-    annual_time_costs = total_hours_per_week * 52 * time_value
-    
-    total_costs = annual_cash_costs + annual_time_costs
-    net_income = total_income - total_costs
-    monthly_net = net_income / 12
-    effective_hourly = net_income / (total_hours_per_week * 52) if total_hours_per_week > 0 else 0
-    
-    # RESULTS SECTION
-    st.markdown("---")
-    st.markdown("## 📊 Your Results")
-    
-    # Summary metrics at top
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Income", f"{symbol}{total_income:,.0f}")
-    with col2:
-        st.metric("Total Costs", f"{symbol}{total_costs:,.0f}")
-    with col3:
-        if net_income > 0:
-            st.metric("Net Income", f"{symbol}{net_income:,.0f}", delta=f"+{symbol}{monthly_net:,.0f}/mo")
-        else:
-            st.metric("Net Loss", f"{symbol}{abs(net_income):,.0f}", delta=f"{symbol}{monthly_net:,.0f}/mo")
-    with col4:
-        st.metric("Hourly Rate", f"{symbol}{effective_hourly:,.0f}")
-    
-    # Two column layout for details
-    results_col1, results_col2 = st.columns(2)
-    
-    with results_col1:
-        # Income breakdown
-        st.markdown("### Income Breakdown")
-        income_data = {
-            "Series income": series_income,
-            "Subscription income": subscription_income,
-            "Corporate income": corporate_income,
-            "Less scholarships": -scholarship_cost
+        # INPUTS SECTION
+        st.markdown("---")
+        col_income, spacer, col_costs = st.columns([5, 1, 5])
+        
+        # INCOME COLUMN
+        with col_income:
+            st.markdown("## 📚 Your Income")
+            
+            st.markdown("### Core Teaching")
+            price_per_student = st.slider(
+                f"Price per student (6-week series) {symbol}", 
+                0, 500, 100, 
+                help="What you charge each student for a complete series"
+            )
+            students_per_series = st.slider(
+                "Students per series", 
+                3, 50, 10,
+                help="Average number of students in each series"
+            )
+            series_per_year = st.slider(
+                "Series per year", 
+                1, 20, 4,
+                help="How many 6-week series you'll run annually"
+            )
+            scholarships = st.slider(
+                "Full scholarships per year", 
+                0, 50, 0,
+                help="Number of students you'll accept for free"
+            )
+            
+            st.markdown("### Additional Income")
+            monthly_members = st.slider(
+                "Monthly subscription members", 
+                0, 100, 0,
+                help="Ongoing monthly practice group members"
+            )
+            monthly_price = st.slider(
+                f"Monthly subscription price {symbol}", 
+                0, 100, 30
+            )
+            corporate_workshops = st.slider(
+                "Corporate workshops per year", 
+                0, 52, 0,
+                help="One-off workshops for organizations"
+            )
+            corporate_price = st.slider(
+                f"Price per corporate workshop {symbol}", 
+                500, 10000, 2000, step=500
+            )
+        
+        # COSTS COLUMN
+        with col_costs:
+            st.markdown("## 💸 Your Costs")
+            
+            st.markdown("### Monthly Cash Costs")
+            venue_cost = st.number_input(
+                f"Venue/Zoom {symbol}", 
+                0, 1000, 50,
+                help="Monthly cost for teaching space or video platform"
+            )
+            insurance_cost = st.number_input(
+                f"Insurance {symbol}", 
+                0, 500, 40,
+                help="Monthly liability insurance"
+            )
+            marketing_cost = st.number_input(
+                f"Marketing/Website {symbol}", 
+                0, 500, 30,
+                help="Monthly marketing and website costs"
+            )
+            
+            st.markdown("### Time Investment")
+            practice_hours = st.slider(
+                "Personal practice (hours/week)", 
+                0, 20, 7,
+                help="Your own meditation practice time"
+            )
+            education_hours = st.slider(
+                "Continuing education (hours/week)", 
+                0, 10, 2,
+                help="Time spent learning and improving"
+            )
+            time_value = st.slider(
+                f"Your time value ({symbol}/hour)", 
+                10, 100, 30,
+                help="What your time is worth per hour"
+            )
+        
+        # CALCULATIONS
+        inputs = {
+            "price_per_student": price_per_student,
+            "students_per_series": students_per_series,
+            "series_per_year": series_per_year,
+            "scholarships": scholarships,
+            "monthly_members": monthly_members,
+            "monthly_price": monthly_price,
+            "corporate_workshops": corporate_workshops,
+            "corporate_price": corporate_price,
+            "venue_cost": venue_cost,
+            "insurance_cost": insurance_cost,
+            "marketing_cost": marketing_cost,
+            "practice_hours": practice_hours,
+            "education_hours": education_hours,
+            "time_value": time_value,
         }
-        for source, amount in income_data.items():
-            if amount != 0:
-                st.write(f"{source}: {symbol}{abs(amount):,.0f}")
-        
-        # Cost breakdown
-        st.markdown("### Cost Breakdown")
-        st.write(f"Cash costs: {symbol}{annual_cash_costs:,.0f}")
-        st.write(f"Time costs: {symbol}{annual_time_costs:,.0f}")
-        st.write(f"Total weekly hours: {total_hours_per_week:.0f}")
-    
-    with results_col2:
-        # Income goals with custom inputs
-        st.markdown("### Income Goals")
-        
-        min_income_goal = st.number_input(
-            f"Minimum income {symbol}", 
-            value=currency_info["min_income"],
-            help="What you need to survive"
-        )
-        side_income_goal = st.number_input(
-            f"Side business {symbol}", 
-            value=currency_info["side_income"],
-            help="Solid part-time income"
-        )
-        full_income_goal = st.number_input(
-            f"Full-time income {symbol}", 
-            value=currency_info["full_income"],
-            help="Replace a full-time job"
-        )
-    
-    # Progress visualization
-    st.markdown("### Progress Toward Goals")
-    
-    if net_income < 0:
-        st.error("🔴 **Operating at a loss**")
-        col1, col2, col3 = st.columns(3)
+        results = compute_scalar(inputs)
+        
+        # Record the inputs for cohort analytics when they change (buffered, not written here)
+        calculator_event = {field: inputs.get(field, results.get(field)) for field in CALCULATOR_FIELDS}
+        calculator_event["currency"] = currency.split(" ")[0]
+        if st.session_state.get('last_calculator_event') != calculator_event:
+            st.session_state.last_calculator_event = calculator_event
+            get_analytics().record(
+                "calculator", analytics_id=st.session_state.analytics_id,
+                has_plan=bool(st.session_state.niche_statement), **calculator_event
+            )
+        
+        series_income = results["series_income"]
+        subscription_income = results["subscription_income"]
+        corporate_income = results["corporate_income"]
+        scholarship_cost = results["scholarship_cost"]
+        total_income = results["total_income"]
+        annual_cash_costs = results["annual_cash_costs"]
+        teaching_hours_per_week = results["teaching_hours_per_week"]
+        prep_hours_per_week = results["prep_hours_per_week"]
+        total_hours_per_week = results["total_hours_per_week"]
+        annual_time_costs = results["annual_time_costs"]
+        total_costs = results["total_costs"]
+        net_income = results["net_income"]
+        monthly_net = results["monthly_net"]
+        effective_hourly = results["effective_hourly"]
+        
+        # RESULTS SECTION
+        st.markdown("---")
+        st.markdown("## 📊 Your Results")
+        
+        # Summary metrics at top
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.write(f"**To minimum:**")
-            st.write(f"Need {symbol}{min_income_goal - net_income:,.0f} more")
+            st.metric("Total Income", f"{symbol}{total_income:,.0f}")
         with col2:
-            st.write(f"**To side income:**")
-            st.write(f"Need {symbol}{side_income_goal - net_income:,.0f} more")
+            st.metric("Total Costs", f"{symbol}{total_costs:,.0f}")
         with col3:
-            st.write(f"**To full-time:**")
-            st.write(f"Need {symbol}{full_income_goal - net_income:,.0f} more")
-    else:
-        st.success("✅ **Generating profit!**")
+            if net_income > 0:
+                st.metric("Net Income", f"{symbol}{net_income:,.0f}", delta=f"+{symbol}{monthly_net:,.0f}/mo")
+            else:
+                st.metric("Net Loss", f"{symbol}{abs(net_income):,.0f}", delta=f"{symbol}{monthly_net:,.0f}/mo")
+        with col4:
+            st.metric("Hourly Rate", f"{symbol}{effective_hourly:,.0f}")
+        
+        # Two column layout for details
+        results_col1, results_col2 = st.columns(2)
+        
+        with results_col1:
+            # Income breakdown
+            st.markdown("### Income Breakdown")
+            income_data = {
+                "Series income": series_income,
+                "Subscription income": subscription_income,
+                "Corporate income": corporate_income,
+                "Less scholarships": -scholarship_cost
+            }
+            for source, amount in income_data.items():
+                if amount != 0:
+                    st.write(f"{source}: {symbol}{abs(amount):,.0f}")
+            
+            # Cost breakdown
+            st.markdown("### Cost Breakdown")
+            st.write(f"Cash costs: {symbol}{annual_cash_costs:,.0f}")
+            st.write(f"Time costs: {symbol}{annual_time_costs:,.0f}")
+            st.write(f"Total weekly hours: {total_hours_per_week:.0f}")
+        
+        with results_col2:
+            # Income goals with custom inputs
+            st.markdown("### Income Goals")
+            
+            min_income_goal = st.number_input(
+                f"Minimum income {symbol}", 
+                value=currency_info["min_income"],
+                help="What you need to survive"
+            )
+            side_income_goal = st.number_input(
+                f"Side business {symbol}", 
+                value=currency_info["side_income"],
+                help="Solid part-time income"
+            )
+            full_income_goal = st.number_input(
+                f"Full-time income {symbol}", 
+                value=currency_info["full_income"],
+                help="Replace a full-time job"
+            )
         
-        min_progress = min(1.0, net_income / min_income_goal) if min_income_goal > 0 else 0
-        side_progress = min(1.0, net_income / side_income_goal) if side_income_goal > 0 else 0
-        full_progress = min(1.0, net_income / full_income_goal) if full_income_goal > 0 else 0
+        # Progress visualization
+        st.markdown("### Progress Toward Goals")
+        
+        if net_income < 0:
+            st.error("🔴 **Operating at a loss**")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.write(f"**To minimum:**")
+                st.write(f"Need {symbol}{min_income_goal - net_income:,.0f} more")
+            with col2:
+                st.write(f"**To side income:**")
+                st.write(f"Need {symbol}{side_income_goal - net_income:,.0f} more")
+            with col3:
+                st.write(f"**To full-time:**")
+                st.write(f"Need {symbol}{full_income_goal - net_income:,.0f} more")
+        else:
+            st.success("✅ **Generating profit!**")
+            
+            min_progress = min(1.0, net_income / min_income_goal) if min_income_goal > 0 else 0
+            side_progress = min(1.0, net_income / side_income_goal) if side_income_goal > 0 else 0
+            full_progress = min(1.0, net_income / full_income_goal) if full_income_goal > 0 else 0
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.progress(min_progress)
+                st.caption(f"Minimum: {int(min_progress * 100)}%")
+            with col2:
+                st.progress(side_progress)
+                st.caption(f"Side income: {int(side_progress * 100)}%")
+            with col3:
+                st.progress(full_progress)
+                st.caption(f"Full-time: {int(full_progress * 100)}%")
+        
+        # Key insights
+        st.markdown("### 💡 Key Insights")
+        
+        total_students = results["total_students"]
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.progress(min_progress)
-            st.caption(f"Minimum: {int(min_progress * 100)}%")
+            st.metric("Students Served", f"{int(total_students)}/year")
         with col2:
-            st.progress(side_progress)
-            st.caption(f"Side income: {int(side_progress * 100)}%")
+            st.metric("Teaching Hours", f"{teaching_hours_per_week:.0f}/week")
         with col3:
-            st.progress(full_progress)
-            st.caption(f"Full-time: {int(full_progress * 100)}%")
-    
-    # Key insights
-    st.markdown("### 💡 Key Insights")
-    
-    total_students = (students_per_series * series_per_year) + monthly_members + scholarships
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Students Served", f"{int(total_students)}/year")
-    with col2:
-        st.metric("Teaching Hours", f"{teaching_hours_per_week:.0f}/week")
-    with col3:
-        st.metric("Prep Hours", f"{prep_hours_per_week:.0f}/week")
+            st.metric("Prep Hours", f"{prep_hours_per_week:.0f}/week")
+        
+        # Goal seek: the exact change to each lever that reaches each goal
+        goals = {"Minimum": min_income_goal, "Side income": side_income_goal, "Full-time": full_income_goal}
+        open_goals = {name: goal for name, goal in goals.items() if net_income < goal}
+        if open_goals:
+            st.markdown("### 🎯 What It Would Take")
+            st.write("Each option changes just one thing, with everything else as set above:")
+            
+            def format_lever(lever, value):
+                return f"{symbol}{value:,}" if lever == "price_per_student" else f"{value:,}"
+            
+            goal_table = []
+            for row in goal_seek(inputs, open_goals):
+                line = {"Change": GOAL_LEVERS[row["lever"]][0], "Now": format_lever(row["lever"], row["current"])}
+                for name in open_goals:
+                    target = row[name]
+                    if target is None:
+                        line[name] = "Not reachable"
+                    else:
+                        line[name] = f"{format_lever(row['lever'], target['value'])} ({target['change']:+,})"
+                        if not target["within_slider"]:
+                            line[name] += " *"
+                goal_table.append(line)
+            st.dataframe(goal_table, hide_index=True, use_container_width=True)
+            st.caption("* beyond the calculator's slider range")
+        
+        # Trade-off map: every combination of two levers, evaluated in one pass
+        st.markdown("### 🗺️ Explore the Trade-offs")
+        st.write("See how two choices together change your results, with everything else as set above.")
+        
+        lever_names = list(LEVERS.keys())
+        map_col1, map_col2, map_col3 = st.columns(3)
+        with map_col1:
+            x_lever = st.selectbox("Across", lever_names, index=0, format_func=lambda lever: LEVERS[lever][0])
+        with map_col2:
+            y_options = [lever for lever in lever_names if lever != x_lever]
+            y_lever = st.selectbox("Down", y_options, index=0, format_func=lambda lever: LEVERS[lever][0])
+        with map_col3:
+            metric = st.selectbox("Show", list(METRICS.keys()), format_func=lambda name: METRICS[name])
+        
+        x_values, y_values, grid = sweep(inputs, x_lever, y_lever, metric)
+        heatmap_data = pd.DataFrame({
+            "x": np.tile(x_values, len(y_values)),
+            "y": np.repeat(y_values, len(x_values)),
+            "value": grid.ravel(),
+        })
+        heatmap = alt.Chart(heatmap_data).mark_rect().encode(
+            x=alt.X("x:O", title=LEVERS[x_lever][0], axis=alt.Axis(labelOverlap=True)),
+            y=alt.Y("y:O", title=LEVERS[y_lever][0], sort="descending", axis=alt.Axis(labelOverlap=True)),
+            color=alt.Color(
+                "value:Q",
+                title=METRICS[metric],
+                scale=alt.Scale(scheme="redyellowgreen", domainMid=0) if metric in ("net_income", "effective_hourly") else alt.Scale(scheme="yelloworangered")
+            ),
+            tooltip=[
+                alt.Tooltip("x:Q", title=LEVERS[x_lever][0]),
+                alt.Tooltip("y:Q", title=LEVERS[y_lever][0]),
+                alt.Tooltip("value:Q", title=METRICS[metric], format=",.0f"),
+            ]
+        )
+        st.altair_chart(heatmap, use_container_width=True)
+        st.caption(f"{grid.size:,} scenarios")
+        
+        # Monte Carlo: the same model with uncertain enrollment, churn and bookings
+        st.markdown("### 🎲 Plan for Uncertainty")
+        st.write("Real classes don't always fill. Simulate many possible years to see how likely each goal is.")
+        
+        # Its own fragment: the simulation settings rerun only the simulation
+        @st.fragment
+        def uncertainty_panel(inputs, goals):
+            if st.toggle("Simulate uncertain enrollment"):
+                sim_col1, sim_col2 = st.columns(2)
+                with sim_col1:
+                    fill_rate = st.slider("Average class fill rate (%)", 30, 100, 80,
+                                          help="Share of your planned students who actually enroll, on average") / 100
+                    fill_spread = st.slider("Fill rate uncertainty (± %)", 0, 30, 15,
+                                            help="How much the fill rate varies from year to year") / 100
+                with sim_col2:
+                    monthly_churn = st.slider("Monthly member churn (%)", 0, 30, 5,
+                                              help="Share of members who leave each month (and are replaced at the same rate)") / 100
+                    workshop_booking = st.slider("Workshops that actually book (%)", 0, 100, 80) / 100
+                samples = st.select_slider("Simulated years", [100_000, 250_000, 500_000, 1_000_000], value=250_000,
+                                           format_func=lambda n: f"{n:,}")
+                
+                @st.cache_data(max_entries=32, show_spinner="Simulating...")
+                def run_simulation(inputs, goals, samples, fill_rate, fill_spread, monthly_churn, workshop_booking):
+                    # Fixed seed so unrelated reruns don't jiggle the results
+                    result = simulate(inputs, goals, samples, fill_rate, fill_spread, monthly_churn, workshop_booking, seed=0)
+                    counts, edges = np.histogram(result.pop("net_income"), bins=40)
+                    result["histogram"] = pd.DataFrame({"net_income": edges[:-1], "to": edges[1:], "years": counts})
+                    return result
+                
+                simulation = run_simulation(inputs, goals, samples, fill_rate, fill_spread, monthly_churn, workshop_booking)
+                bands = simulation["percentiles"]
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Typical year (median)", f"{symbol}{bands[50]:,.0f}")
+                with col2:
+                    st.metric("Likely range (middle 50%)", f"{symbol}{bands[25]:,.0f} – {symbol}{bands[75]:,.0f}")
+                with col3:
+                    st.metric("Bad year / good year", f"{symbol}{bands[5]:,.0f} / {symbol}{bands[95]:,.0f}",
+                              help="5th and 95th percentile")
+                
+                histogram = alt.Chart(simulation["histogram"]).mark_bar().encode(
+                    x=alt.X("net_income:Q", bin="binned", title=f"Net income ({symbol})"),
+                    x2="to:Q",
+                    y=alt.Y("years:Q", title="Simulated years")
+                )
+                st.altair_chart(histogram, use_container_width=True)
+                
+                col1, col2, col3 = st.columns(3)
+                for col, (name, probability) in zip([col1, col2, col3], simulation["goal_probability"].items()):
+                    with col:
+                        st.progress(probability)
+                        st.caption(f"{name}: {probability:.0%} chance")
+        
+        uncertainty_panel(inputs, goals)
     
-    # Recommendations
-    if net_income < min_income_goal:
-        st.markdown("### 🎯 Recommendations")
-        recommendations = []
-        
-        if corporate_workshops == 0:
-            recommendations.append("• Add just 1 corporate workshop per month for significant income boost")
-        if monthly_members == 0:
-            recommendations.append("• Start a monthly membership program for recurring revenue")
-        if price_per_student < 150:
-            recommendations.append("• Consider raising prices - even $25 more makes a big difference")
-        if students_per_series < 15:
-            recommendations.append("• Focus on filling classes - marketing can pay for itself")
-        
-        for rec in recommendations[:3]:  # Show top 3 recommendations
-            st.write(rec)
+    calculator_body()
 # ============================================
 # SIDEBAR (appears on all pages)
 # ============================================
@@ -885,6 +1577,9 @@ with st.sidebar:
         with st.expander("Your niche"):
             st.write(st.session_state.niche_statement)
     
+    if st.session_state.page != 'home' and get_session_store().persistent:
+        st.caption("🔖 Your progress is saved. Bookmark this page to come back to it.")
+    
     # Navigation
     st.divider()
     st.write("**Quick Navigation:**")
@@ -903,4 +1598,46 @@ with st.sidebar:
     if st.button("🔄 Start Fresh", key="sidebar_start_over"):
         for key in st.session_state.keys():
             del st.session_state[key]
-        st.rerun()
\ No newline at end of file
+        # New resume link too, so the old one still opens the old plan
+        del st.query_params["resume"]
+        st.rerun()
+    
+    # Admin panel (hidden unless ?admin=<ADMIN_TOKEN>)
+    if is_admin():
+        st.divider()
+        with st.expander("🔧 Admin"):
+            st.write("**AI response cache**")
+            st.json(get_response_cache().stats())
+            st.write("**Near-duplicate cache (most used entries)**")
+            semantic_stats = get_semantic_cache().stats()
+            st.dataframe(semantic_stats.pop("top"), hide_index=True)
+            st.json(semantic_stats)
+            st.write("**Session state by live session (bytes)**")
+            session_rows, session_bytes = get_session_registry().snapshot(is_live_session)
+            st.caption(f"{len(session_rows)} sessions, {session_bytes:,} bytes in total")
+            st.dataframe(session_rows, hide_index=True)
+            st.write("**Analytics store**")
+            st.json(get_analytics().stats())
+            st.write("**Saved sessions**")
+            st.json(get_session_store().stats())
+            st.write("**Anthropic client**")
+            st.json(get_shared_client().health())
+            st.write("**Token usage (recent calls)**")
+            st.dataframe(list(get_shared_client().recent_usage))
+            telemetry = get_telemetry()
+            st.write("**LLM latency by stage (seconds)**")
+            st.dataframe(telemetry.percentiles("wall_seconds", by="stage"))
+            st.write("**Time to first token by stage (seconds)**")
+            st.dataframe(telemetry.percentiles("ttft_seconds", by="stage"))
+            st.write("**Outcomes by task**")
+            st.dataframe(telemetry.outcomes(by="task"))
+            st.write("**Latency budget misses by task**")
+            st.dataframe(telemetry.budget_misses(by="task"))
+            st.write("**Routes (model, max_tokens, latency budget per task)**")
+            for tier in get_router().unset_tiers:
+                st.warning(f"MODEL_TIERS.{tier} is not set: its routes use the standard model.")
+            st.dataframe(get_router().table())
+
+# Save whatever this run changed without a rerun (e.g. a new AI reply)
+checkpoint()
+track_memory()
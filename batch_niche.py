@@ -0,0 +1,261 @@
+"""Run pre-collected intake answers through the niche prompts, without the UI.
+
+Reads intake records from JSONL, one per line, with the same keys as the
+app's session responses:
+  challenge, transformation, groups, selected_group, specific_struggle,
+  acute_moment, recognition
+and optionally specific_who, size_check, availability, format_pref and
+location. Each record gets the calls the interactive flow makes (the group
+insight, the viability feedback, then one call per offering tier, the three
+at once) with the same prompts, and the finished plan is appended to the
+output JSONL as soon as it is done. Offerings are written as structured data
+(a list of one object per tier, see offerings.py) plus their text in
+offerings_text.
+
+Records are processed concurrently on the async Anthropic client, at most
+--concurrency at a time. The output file is the checkpoint: records whose id
+is already in it are skipped, so an interrupted run picks up where it
+stopped. Records that fail, and lines that are not a JSON object, are
+written to <output>.errors.jsonl and retried on the next run; the rest of
+the file is still processed.
+
+    python batch_niche.py intake.jsonl plans.jsonl --concurrency 16 --fast-model claude-haiku-4-5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import anthropic
+
+from claude_client import tool_input, usage_summary, TOKEN_FIELDS
+from offerings import offering_text, offerings_text, record_offering_tool, validate_offering, TIERS
+from prompts import (
+    build_niche_statement, build_request, fold_old_turns, group_insight_prompt,
+    offering_prompt, viability_prompt, SYSTEM_PROMPTS
+)
+from routing import Router, MODEL_TIERS
+
+REQUIRED_FIELDS = [
+    "challenge", "transformation", "groups", "selected_group",
+    "specific_struggle", "acute_moment", "recognition",
+]
+# Answers the interactive flow collects that intake forms often leave out
+OPTIONAL_DEFAULTS = {
+    "specific_who": "",
+    "size_check": "Yes - I can name 50+ people",
+    "availability": "Not specified",
+    "format_pref": "Not specified",
+    "location": "Not specified",
+}
+
+
+# ============================================
+# READING
+# ============================================
+
+def read_intake(path, id_field="id", on_error=None):
+    """Yield (id, record) pairs; records without an id are keyed by line number
+
+    Lines that are not a JSON object are skipped, after calling
+    on_error(line number, message) if given.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record, error = None, f"JSONDecodeError: {e}"
+            else:
+                error = None if isinstance(record, dict) else f"expected a JSON object, got {type(record).__name__}"
+            if error is not None:
+                if on_error is not None:
+                    on_error(str(line_number), error)
+                continue
+            yield str(record.get(id_field) or line_number), record
+
+
+def completed_ids(path):
+    """Ids already written to the output, so a restarted run can skip them"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                # A line cut short by an interrupted write; that record is redone
+                pass
+    return done
+
+
+# ============================================
+# ONE PLAN
+# ============================================
+
+class Plan:
+    """The conversation for one intake record, mirroring a session in the app"""
+
+    def __init__(self, client, record, router=None):
+        missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        self.client = client
+        self.router = router or Router()
+        self.responses = {**OPTIONAL_DEFAULTS, **record}
+        self.conversation = []
+        self.conversation_summary = []
+        self.usage = dict.fromkeys(TOKEN_FIELDS, 0)
+
+    async def ask(self, prompt, stage, task, tool=None):
+        route = self.router.route(task)
+        request = build_request(
+            route["model"], route["max_tokens"], prompt, "", stage, self.responses,
+            self.conversation, self.conversation_summary, tool=tool, system=SYSTEM_PROMPTS[route["system"]]
+        )
+        message = await self.client.messages.create(**request)
+        for key, value in usage_summary(message.usage).items():
+            self.usage[key] += value
+        return message
+
+    async def ask_text(self, prompt, stage, task):
+        response = (await self.ask(prompt, stage, task)).content[0].text
+        self.remember(prompt, response)
+        return response
+
+    def remember(self, prompt, response):
+        self.conversation.extend([{"role": "user", "content": prompt}, {"role": "assistant", "content": response}])
+        fold_old_turns(self.conversation, self.conversation_summary)
+
+    async def offering(self, niche, tier):
+        r = self.responses
+        prompt = offering_prompt(niche, tier, r["availability"], r["format_pref"], r["location"])
+        message = await self.ask(prompt, "offerings", "offering", tool=record_offering_tool(tier))
+        # A reply that doesn't fit the schema fails the record, so the next run retries it
+        offering = validate_offering(tool_input(message), tier)
+        self.remember(prompt, offering_text(offering))
+        return offering
+
+    async def run(self):
+        r = self.responses
+        niche = build_niche_statement(r["selected_group"], r["specific_struggle"], r["acute_moment"], r["specific_who"])
+        insight = await self.ask_text(group_insight_prompt(r["selected_group"]), "select_group", "group_insight")
+        feedback = await self.ask_text(
+            viability_prompt(niche, r["size_check"], r["recognition"]), "test", "viability_feedback"
+        )
+        # One call per tier, all at once, like the app
+        offerings = await asyncio.gather(*(
+            self.offering(niche, tier) for tier in TIERS
+        ))
+        return {
+            "niche_statement": niche,
+            "group_insight": insight,
+            "viability_feedback": feedback,
+            "offerings": offerings,
+            "offerings_text": offerings_text(offerings),
+            "usage": self.usage,
+        }
+
+
+# ============================================
+# PIPELINE
+# ============================================
+
+async def run(input_path, output_path, concurrency=8, id_field="id", client=None, model=None, fast_model=None):
+    """Process every record not already in output_path; returns (done, failed, skipped)
+
+    Each call uses the app's route for its task (routing.py), with
+    fast_model for the fast tier (the standard model if None), unless model
+    is given, which is then used for every call.
+    """
+    client = client or anthropic.AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+    router = Router(models=dict.fromkeys(MODEL_TIERS, model) if model else {"fast": fast_model})
+    done_ids = completed_ids(output_path)
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+    # Bounded, so the reader never runs far ahead of the workers
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            open(output_path + ".errors.jsonl", "a", encoding="utf-8") as errors:
+
+        def write(f, row):
+            # One line per record, flushed at once: the output doubles as the checkpoint
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+
+        def fail(record_id, error):
+            write(errors, {"id": record_id, "error": error})
+            counts["failed"] += 1
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                record_id, record = item
+                started = time.perf_counter()
+                try:
+                    plan = await Plan(client, record, router).run()
+                except Exception as e:
+                    # Whatever one record does, the worker goes on to the next
+                    fail(record_id, f"{type(e).__name__}: {e}")
+                    continue
+                write(out, {
+                    "id": record_id,
+                    **plan,
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "completed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                })
+                counts["done"] += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for record_id, record in read_intake(input_path, id_field, on_error=fail):
+                if record_id in done_ids:
+                    counts["skipped"] += 1
+                    continue
+                await queue.put((record_id, record))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+    return counts["done"], counts["failed"], counts["skipped"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("input", help="intake answers as .jsonl")
+    parser.add_argument("output", help="completed plans, appended as .jsonl")
+    parser.add_argument("--concurrency", type=int, default=8, help="records in flight at once")
+    parser.add_argument("--id-field", default="id", help="record key that identifies a teacher")
+    parser.add_argument("--model", help="use this model for every call instead of the per-task routes")
+    parser.add_argument("--fast-model", default=os.environ.get("ANTHROPIC_FAST_MODEL"),
+                        help="model for the fast tier's routes (default: $ANTHROPIC_FAST_MODEL, "
+                             "else the standard model)")
+    args = parser.parse_args(argv)
+
+    if not os.environ.get("ANTHROPIC_API_KEY"):
+        sys.exit("Set ANTHROPIC_API_KEY first")
+    started = time.perf_counter()
+    try:
+        done, failed, skipped = asyncio.run(
+            run(args.input, args.output, args.concurrency, args.id_field, model=args.model,
+                fast_model=args.fast_model)
+        )
+    except KeyboardInterrupt:
+        sys.exit(f"\nInterrupted; finished plans are in {args.output}, rerun to continue")
+    print(f"Wrote {done:,} plans to {args.output} in {time.perf_counter() - started:.1f}s "
+          f"({skipped:,} already done, {failed:,} failed)")
+    if failed:
+        print(f"Failures are in {args.output}.errors.jsonl; rerun to retry them")
+
+
+if __name__ == "__main__":
+    main()
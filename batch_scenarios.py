@@ -0,0 +1,266 @@
+"""Evaluate many calculator scenarios at once, without the UI.
+
+Reads scenarios from CSV or JSONL, one per row, and writes every figure the
+calculator page shows (income, costs, hours, effective hourly rate and
+progress toward the three income goals) to CSV or Parquet.
+
+Input columns are the calculator inputs (see income.DEFAULT_INPUTS); any
+that are missing use the page defaults. Optional columns:
+  currency         a key of income.CURRENCY_DATA ("USD ($)") or its code ("USD")
+  min_income_goal, side_income_goal, full_income_goal
+                   override the currency's default goals
+Any other columns (teacher_id, cohort...) are copied through unchanged.
+
+Rows are streamed in chunks and evaluated on a process pool, with only a
+bounded number of chunks in flight, so memory stays flat however large the
+input is. Output rows keep input order.
+
+    python batch_scenarios.py cohort.csv results.csv
+    python batch_scenarios.py cohort.jsonl results.parquet --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from income import compute, CURRENCY_DATA, DEFAULT_INPUTS
+
+GOAL_FIELDS = {
+    "min_income_goal": ("min_income", "min"),
+    "side_income_goal": ("side_income", "side"),
+    "full_income_goal": ("full_income", "full"),
+}
+CURRENCY_CODES = {key.split(" ")[0]: key for key in CURRENCY_DATA}
+OPTION_FIELDS = ["currency", *GOAL_FIELDS]
+INPUT_FIELDS = list(DEFAULT_INPUTS)
+
+# Every derived figure the calculator page shows, in output order
+METRIC_FIELDS = [
+    "series_income", "subscription_income", "corporate_income", "scholarship_cost", "total_income",
+    "annual_cash_costs", "annual_time_costs", "total_costs", "net_income", "monthly_net",
+    "teaching_hours_per_week", "prep_hours_per_week", "total_hours_per_week", "effective_hourly",
+    "total_students",
+]
+GOAL_OUTPUT_FIELDS = [
+    field
+    for _, short in GOAL_FIELDS.values()
+    for field in (f"{short}_income_goal_progress", f"{short}_income_goal_shortfall")
+]
+
+
+# ============================================
+# READING
+# ============================================
+
+def read_rows(path, fmt):
+    """Yield input rows as dicts, one at a time, from CSV or JSONL
+
+    A JSONL line that isn't valid JSON is yielded as its ValueError, so it
+    becomes an error row in its place.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield ValueError(f"invalid JSON: {e}")
+
+
+def first_row_fields(path, fmt):
+    """Column names of the input, from the CSV header or the first JSONL record"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            return next(csv.reader(f), [])
+        for line in f:
+            try:
+                record = json.loads(line) if line.strip() else None
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                return list(record)
+    return []
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ============================================
+# EVALUATION (runs in worker processes)
+# ============================================
+
+def _parse(row):
+    """Calculator inputs and goals for one row; raises ValueError on bad data"""
+    if isinstance(row, ValueError):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError(f"expected a JSON object, got {type(row).__name__}")
+    inputs = {}
+    for field, default in DEFAULT_INPUTS.items():
+        value = row.get(field)
+        inputs[field] = default if value in (None, "") else float(value)
+
+    currency = row.get("currency") or "USD ($)"
+    currency = CURRENCY_CODES.get(currency, currency)
+    if currency not in CURRENCY_DATA:
+        raise ValueError(f"unknown currency {currency!r}")
+    goals = {}
+    for field, (currency_key, _) in GOAL_FIELDS.items():
+        value = row.get(field)
+        goals[field] = CURRENCY_DATA[currency][currency_key] if value in (None, "") else float(value)
+    return currency, inputs, goals
+
+
+def evaluate_chunk(rows, passthrough):
+    """Evaluate a chunk of raw rows in one vectorized pass; returns output rows"""
+    parsed = []
+    errors = {}
+    for i, row in enumerate(rows):
+        try:
+            parsed.append((i, *_parse(row)))
+        except (TypeError, ValueError) as e:
+            errors[i] = str(e)
+
+    results = {}
+    if parsed:
+        columns = {field: np.array([p[2][field] for p in parsed]) for field in INPUT_FIELDS}
+        metrics = compute(**columns)
+        net_income = metrics["net_income"]
+        goal_columns = {field: np.array([p[3][field] for p in parsed]) for field in GOAL_FIELDS}
+        for field, (_, short) in GOAL_FIELDS.items():
+            goal = goal_columns[field]
+            metrics[f"{short}_income_goal_progress"] = np.where(
+                goal > 0, np.clip(net_income / np.where(goal > 0, goal, 1), 0, 1), 0.0
+            )
+            metrics[f"{short}_income_goal_shortfall"] = np.maximum(goal - net_income, 0)
+        for j, (i, currency, inputs, goals) in enumerate(parsed):
+            out = {"currency": currency, **inputs, **goals}
+            for field in METRIC_FIELDS + GOAL_OUTPUT_FIELDS:
+                out[field] = round(float(metrics[field][j]), 4)
+            results[i] = out
+
+    output = []
+    for i, row in enumerate(rows):
+        out = {field: row.get(field) if isinstance(row, dict) else None for field in passthrough}
+        out.update(results.get(i, {}))
+        out["error"] = errors.get(i, "")
+        output.append(out)
+    return output
+
+
+# ============================================
+# WRITING
+# ============================================
+
+class CsvSink:
+    def __init__(self, path, fields):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fields, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes one row group per chunk (needs pyarrow)"""
+
+    def __init__(self, path, fields):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa = pa
+        numeric = set(GOAL_FIELDS) | set(INPUT_FIELDS) | set(METRIC_FIELDS) | set(GOAL_OUTPUT_FIELDS)
+        # Fixed schema, so chunks that are all errors still line up
+        self._schema = pa.schema([
+            (field, pa.float64() if field in numeric else pa.string()) for field in fields
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        columns = {}
+        for field in self._schema:
+            values = [row.get(field.name) for row in rows]
+            if field.type == self._pa.string():
+                values = [None if value is None else str(value) for value in values]
+            columns[field.name] = values
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_sink(path, fields):
+    return ParquetSink(path, fields) if path.endswith(".parquet") else CsvSink(path, fields)
+
+
+# ============================================
+# MAIN
+# ============================================
+
+def run(input_path, output_path, fmt=None, workers=None, chunk_size=5000):
+    """Stream input_path through the calculator into output_path; returns the row count"""
+    fmt = fmt or ("jsonl" if input_path.endswith((".jsonl", ".ndjson")) else "csv")
+    workers = workers or os.cpu_count() or 1
+    known = set(INPUT_FIELDS) | set(OPTION_FIELDS)
+    passthrough = [field for field in first_row_fields(input_path, fmt) if field not in known]
+    fields = passthrough + OPTION_FIELDS + INPUT_FIELDS + METRIC_FIELDS + GOAL_OUTPUT_FIELDS + ["error"]
+
+    sink = open_sink(output_path, fields)
+    total = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep only a couple of chunks per worker in flight; write in input order
+            in_flight = deque()
+            for chunk in chunks(read_rows(input_path, fmt), chunk_size):
+                in_flight.append(pool.submit(evaluate_chunk, chunk, passthrough))
+                if len(in_flight) >= workers * 2:
+                    rows = in_flight.popleft().result()
+                    sink.write(rows)
+                    total += len(rows)
+            while in_flight:
+                rows = in_flight.popleft().result()
+                sink.write(rows)
+                total += len(rows)
+    finally:
+        sink.close()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("input", help="scenarios as .csv or .jsonl")
+    parser.add_argument("output", help="results as .csv or .parquet")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per chunk")
+    args = parser.parse_args(argv)
+
+    total = run(args.input, args.output, args.format, args.workers, args.chunk_size)
+    print(f"Wrote {total:,} scenarios to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Headless benchmark of the full app flow with a stub LLM.
+
+Drives app.py with Streamlit's AppTest from the home page through every
+niche stage to `complete`, then through the calculator. `anthropic` is
+replaced by benchmarks/stub_anthropic.py, so no network or API key is
+needed and replies are deterministic.
+
+For every step it records how long the interaction took, how many script
+runs it caused (hidden st.rerun() calls included) and how many bytes of
+session state the session holds afterwards. It also counts the LLM calls
+issued per stage. Save the results with --output and pass an older file to
+--compare to see what a change did.
+
+AppTest always reruns the whole script, so interactions inside an
+st.fragment count as full runs here; under a real server they only rerun
+the fragment. Form fills cost no runs until the form is submitted.
+
+    python benchmarks/bench_flow.py --repeat 5 --latency 0.05 --output bench.json
+    python benchmarks/bench_flow.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+APP_PATH = REPO_DIR / "app.py"
+
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_DIR))
+
+import stub_anthropic  # noqa: E402
+from session_memory import state_sizes  # noqa: E402
+
+stub_anthropic.install()
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+# ============================================
+# SCRIPT RUN COUNTER
+# ============================================
+
+# Every script run starts with st.set_page_config, so counting those counts
+# reruns, including the ones triggered by st.rerun() inside the app.
+_script_runs = 0
+_set_page_config = st.set_page_config
+
+
+def _counting_set_page_config(*args, **kwargs):
+    global _script_runs
+    _script_runs += 1
+    return _set_page_config(*args, **kwargs)
+
+
+st.set_page_config = _counting_set_page_config
+
+
+# ============================================
+# FLOW
+# ============================================
+
+def _button(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"No button labelled {label!r} on stage {at.session_state['stage']!r}")
+
+
+def _slider(at, label_prefix):
+    for slider in at.slider:
+        if slider.label.startswith(label_prefix):
+            return slider
+    raise LookupError(f"No slider starting with {label_prefix!r}")
+
+
+def _fill(widget, value):
+    widget.set_value(value).run()
+
+
+def _type(widget, value):
+    """Fill a widget inside a form: nothing runs until the form is submitted"""
+    widget.set_value(value)
+
+
+def flow_steps():
+    """(name, action) pairs that walk a user through the whole app"""
+    def fill_story(at):
+        _type(at.text_area[0], "Panic attacks before presentations at work")
+        _type(at.text_area[1], "I can now notice the panic rising and let it pass")
+
+    def fill_groups(at):
+        for i, group in enumerate(["New parents", "Nurses on night shift", "Recent retirees"]):
+            _type(at.text_input(key=f"group_{i}"), group)
+
+    def fill_narrow(at):
+        _fill(at.text_area[0], "racing thoughts and guilt")
+        _fill(at.text_area[1], "during the 3am feed")
+
+    def fill_test(at):
+        _type(at.radio[0], "Yes - I can name 50+ people")
+        _type(at.text_area[0], "Do you lie awake at 3am replaying the day?")
+
+    def fill_offerings(at):
+        _type(at.text_input[0], "Weekday mornings")
+        _type(at.selectbox[0], "6-week series")
+        _type(at.text_input[1], "Online via Zoom")
+
+    def move_sliders(at):
+        _fill(_slider(at, "Price per student"), 150)
+        _fill(_slider(at, "Students per series"), 12)
+        _fill(_slider(at, "Series per year"), 6)
+        _fill(_slider(at, "Monthly subscription members"), 20)
+        _fill(_slider(at, "Corporate workshops per year"), 4)
+
+    return [
+        ("home", lambda at: at.run()),
+        ("open_niche", lambda at: _button(at, "Start Niche Finder").click().run()),
+        ("welcome_begin", lambda at: _button(at, "Let's Begin! →").click().run()),
+        ("story_fill", fill_story),
+        ("story_continue", lambda at: _button(at, "Continue →").click().run()),
+        ("groups_fill", fill_groups),
+        ("groups_continue", lambda at: _button(at, "Continue →").click().run()),
+        ("select_group_pick", lambda at: _fill(at.radio[0], "New parents")),
+        ("select_group_continue", lambda at: _button(at, "Continue →").click().run()),
+        ("narrow_fill", fill_narrow),
+        ("narrow_continue", lambda at: _button(at, "Continue →").click().run()),
+        ("test_fill", fill_test),
+        ("test_feedback", lambda at: _button(at, "Get Feedback").click().run()),
+        ("test_continue", lambda at: _button(at, "Continue →").click().run()),
+        ("offerings_fill", fill_offerings),
+        ("offerings_generate", lambda at: _button(at, "Generate My Three Offerings").click().run()),
+        ("complete_to_calculator", lambda at: _button(at, "💰 Go to Calculator").click().run()),
+        ("calculator_sliders", move_sliders),
+    ]
+
+
+def session_state_bytes(at):
+    """Pickled size of everything in session state that can be pickled"""
+    return sum(state_sizes(dict(at.session_state.items())).values())
+
+
+def run_flow(timeout):
+    """Walk the flow once in a fresh session and process-level caches"""
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    stub_anthropic.reset_calls()
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.secrets["ANTHROPIC_API_KEY"] = "stub"
+    at.secrets["TELEMETRY_PATH"] = ""
+    at.secrets["RESPONSE_CACHE_DB"] = ""
+    at.secrets["SESSION_DB"] = ""
+    at.secrets["ANALYTICS_DIR"] = ""
+    at.secrets["MODEL_TIERS"] = {"fast": "stub-fast"}
+
+    steps = []
+    for name, action in flow_steps():
+        runs_before = _script_runs
+        started = time.perf_counter()
+        action(at)
+        seconds = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(f"App raised during step {name}: {at.exception[0].value}")
+        steps.append({
+            "step": name,
+            "stage": at.session_state["stage"] if at.session_state["page"] == "niche" else at.session_state["page"],
+            "seconds": seconds,
+            "script_runs": _script_runs - runs_before,
+            "session_state_bytes": session_state_bytes(at),
+        })
+
+    # Let background prefetches land before counting calls
+    time.sleep(stub_anthropic.LATENCY * 2 + 0.1)
+    calls_by_stage = {}
+    for call in stub_anthropic.calls():
+        calls_by_stage[call["stage"]] = calls_by_stage.get(call["stage"], 0) + 1
+    return steps, calls_by_stage
+
+
+def benchmark(repeat, latency, chunk_delay, timeout):
+    stub_anthropic.configure(latency=latency, chunk_delay=chunk_delay)
+    runs = [run_flow(timeout) for _ in range(repeat)]
+
+    steps = []
+    for i, first in enumerate(runs[0][0]):
+        samples = [run_steps[i]["seconds"] for run_steps, _ in runs]
+        steps.append({
+            "step": first["step"],
+            "stage": first["stage"],
+            "median_seconds": round(statistics.median(samples), 4),
+            "min_seconds": round(min(samples), 4),
+            "script_runs": first["script_runs"],
+            "session_state_bytes": first["session_state_bytes"],
+        })
+    calls_by_stage = runs[0][1]
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"repeat": repeat, "latency": latency, "chunk_delay": chunk_delay},
+        "steps": steps,
+        "total_median_seconds": round(sum(step["median_seconds"] for step in steps), 4),
+        "total_script_runs": sum(step["script_runs"] for step in steps),
+        "llm_calls_by_stage": calls_by_stage,
+        "llm_calls_total": sum(calls_by_stage.values()),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def print_report(result, baseline=None):
+    old_steps = {step["step"]: step for step in baseline["steps"]} if baseline else {}
+    header = f"{'step':<26}{'stage':<14}{'median s':>10}{'runs':>6}{'state B':>10}"
+    if baseline:
+        header += f"{'Δ s':>10}{'Δ runs':>8}"
+    print(header)
+    for step in result["steps"]:
+        line = (f"{step['step']:<26}{step['stage']:<14}{step['median_seconds']:>10.4f}"
+                f"{step['script_runs']:>6}{step['session_state_bytes']:>10}")
+        old = old_steps.get(step["step"])
+        if old:
+            line += (f"{step['median_seconds'] - old['median_seconds']:>+10.4f}"
+                     f"{step['script_runs'] - old['script_runs']:>+8}")
+        print(line)
+
+    print()
+    print(f"Total: {result['total_median_seconds']:.4f}s over {result['total_script_runs']} script runs")
+    print("LLM calls by stage:")
+    stages = sorted(set(result["llm_calls_by_stage"]) | set(baseline["llm_calls_by_stage"] if baseline else []), key=str)
+    for stage in stages:
+        line = f"  {str(stage):<14}{result['llm_calls_by_stage'].get(stage, 0):>4}"
+        if baseline:
+            line += f"  (was {baseline['llm_calls_by_stage'].get(stage, 0)})"
+        print(line)
+    print(f"  {'total':<14}{result['llm_calls_total']:>4}")
+    if baseline:
+        print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=3, help="times to walk the flow (median is reported)")
+    parser.add_argument("--latency", type=float, default=float(os.environ.get("STUB_LLM_LATENCY", 0)),
+                        help="stub LLM delay before the first token, in seconds")
+    parser.add_argument("--chunk-delay", type=float, default=float(os.environ.get("STUB_LLM_CHUNK_DELAY", 0)),
+                        help="stub LLM delay between streamed chunks, in seconds")
+    parser.add_argument("--timeout", type=float, default=30, help="AppTest timeout per script run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    result = benchmark(args.repeat, args.latency, args.chunk_delay, args.timeout)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
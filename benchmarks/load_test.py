@@ -0,0 +1,607 @@
+"""Load test: many concurrent sessions against a real local Streamlit server.
+
+Starts `streamlit run app.py` in a scratch directory, with its own secrets
+pointing `anthropic` at mock_anthropic_server.py, then opens one websocket
+per simulated user and speaks Streamlit's protocol directly: every user
+walks the niche flow (the same steps as bench_flow.py) to `complete`, then
+moves the calculator sliders. Users start spread over --ramp seconds and
+pause --think-time seconds (on average) between steps; while a user
+thinks, the fragments the app asked to poll are rerun the way the browser
+does.
+
+For every user count given it reports rerun latency (send to
+script_finished, whole flow and per step), the server's CPU use and RSS
+growth sampled from /proc, and the API calls per user seen by the mock.
+Each user count gets a fresh server; --warmup users walk the flow first,
+so lazy imports don't count as growth and the caches start warm, and
+neither their reruns nor their API calls are counted.
+
+    python benchmarks/load_test.py --users 5 10 20 --latency 0.5 --error-rate 0.02
+    python benchmarks/load_test.py --users 25 --think-time 0 --output load.json
+
+Needs `websockets` (not in requirements.txt; the app doesn't use it) and
+Linux for the /proc sampling.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+APP_PATH = REPO_DIR / "app.py"
+
+sys.path.insert(0, str(BENCH_DIR))
+
+import websockets  # noqa: E402
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from streamlit.proto.WidgetStates_pb2 import WidgetState  # noqa: E402
+
+from mock_anthropic_server import MockAnthropic  # noqa: E402
+
+DONE = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+        ForwardMsg.FINISHED_WITH_COMPILE_ERROR}
+# Element type -> WidgetState field its value goes in
+VALUE_FIELDS = {
+    "text_area": "string_value",
+    "text_input": "string_value",
+    "radio": "string_value",
+    "selectbox": "string_value",
+    "slider": "double_array_value",
+}
+# What the app shows when an AI call failed (error_message and offering_error in app.py)
+AI_ERRORS = ("Error connecting to AI", "The AI is very busy", "came back incomplete")
+GROUPS = ["New parents", "Nurses on night shift", "Recent retirees", "First-year teachers",
+          "Caregivers of parents with dementia", "Night shift nurses", "new parent", "Small business owners"]
+
+
+# ============================================
+# SERVER
+# ============================================
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_secrets(workdir, api_url, overrides):
+    """secrets.toml for the server: the mock API and scratch paths, plus overrides"""
+    secrets = {
+        "ANTHROPIC_API_KEY": "load-test",
+        "ANTHROPIC_BASE_URL": api_url,
+        "ANTHROPIC_REQUESTS_PER_MINUTE": 0,
+        "TELEMETRY_PATH": str(workdir / "llm_calls.jsonl"),
+        "SESSION_DB": str(workdir / "sessions.sqlite3"),
+        "ANALYTICS_DIR": str(workdir / "analytics"),
+        "MODEL_TIERS": {"fast": "mock-fast"},
+        **overrides,
+    }
+    lines = []
+    for key, value in secrets.items():
+        # Tables as dotted keys, so they can sit anywhere in the file
+        items = value.items() if isinstance(value, dict) else [(None, value)]
+        lines += [f"{key}{'.' + name if name else ''} = {json.dumps(item)}\n" for name, item in items]
+    path = workdir / ".streamlit" / "secrets.toml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(lines))
+
+
+def start_server(workdir, port, timeout=60):
+    """Run the app headless from workdir and wait until it answers health checks"""
+    log = open(workdir / "streamlit.log", "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+         "--server.headless", "true",
+         "--server.port", str(port),
+         "--server.address", "127.0.0.1",
+         "--server.enableXsrfProtection", "false",
+         "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=workdir, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Streamlit exited with {process.returncode}, see {workdir / 'streamlit.log'}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Streamlit did not become healthy within {timeout}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ============================================
+# PROCESS SAMPLER
+# ============================================
+
+class ProcessSampler:
+    """Samples CPU time and RSS of one process from /proc on a thread"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.samples = []  # (time, cpu seconds, rss bytes)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+
+    def read(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / self.ticks  # utime + stime
+        rss = 0
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+        return time.time(), cpu, rss
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.samples.append(self.read())
+            except OSError:
+                return
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.samples.append(self.read())
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        try:
+            self.samples.append(self.read())
+        except OSError:
+            pass
+
+    def summary(self, baseline_rss):
+        """CPU % (of one core) average and peak, and RSS from baseline to peak and end"""
+        samples = self.samples
+        rates = [(c2 - c1) / (t2 - t1) * 100 for (t1, c1, _), (t2, c2, _) in zip(samples, samples[1:]) if t2 > t1]
+        wall = samples[-1][0] - samples[0][0]
+        rss = [sample[2] for sample in samples]
+        return {
+            "cpu_percent_avg": round((samples[-1][1] - samples[0][1]) / wall * 100, 1) if wall else 0.0,
+            "cpu_percent_peak": round(max(rates), 1) if rates else 0.0,
+            "cpu_seconds": round(samples[-1][1] - samples[0][1], 2),
+            "rss_start_mb": round(baseline_rss / 2 ** 20, 1),
+            "rss_peak_mb": round(max(rss) / 2 ** 20, 1),
+            "rss_end_mb": round(rss[-1] / 2 ** 20, 1),
+            "rss_growth_mb": round((rss[-1] - baseline_rss) / 2 ** 20, 1),
+        }
+
+
+# ============================================
+# SIMULATED USER
+# ============================================
+
+class Session:
+    """One browser tab: a websocket, the widgets on screen and their values"""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.websocket = None
+        self.widgets = {}  # label -> {id, type, fragment_id, form_id}
+        self.states = {}  # widget id -> WidgetState the browser would send back
+        self.fragments = {}  # fragment id -> auto-rerun interval
+        self.page_script_hash = ""
+        self.ai_errors = []
+        self.exceptions = []
+        self.poll_seconds = []
+        self._finished = None
+        self._busy = asyncio.Lock()
+        self._tasks = []
+
+    async def connect(self):
+        self.websocket = await websockets.connect(
+            self.url, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout
+        )
+        self._tasks = [asyncio.create_task(self._read()), asyncio.create_task(self._poll())]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    # Messages from the server
+    async def _read(self):
+        async for data in self.websocket:
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self._new_run(msg.new_session)
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._element(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "auto_rerun":
+                self.fragments[msg.auto_rerun.fragment_id] = msg.auto_rerun.interval
+            elif kind == "script_finished" and msg.script_finished in DONE:
+                if self._finished is not None and not self._finished.done():
+                    self._finished.set_result(msg.script_finished)
+
+    def _new_run(self, new_session):
+        self.page_script_hash = new_session.page_script_hash or self.page_script_hash
+        fragment_ids = set(new_session.fragment_ids_this_run)
+        if not fragment_ids:
+            self.widgets.clear()
+            self.fragments.clear()
+            return
+        self.widgets = {label: widget for label, widget in self.widgets.items()
+                        if widget["fragment_id"] not in fragment_ids}
+
+    def _element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.exceptions.append(element.exception.message)
+        elif kind in ("alert", "markdown"):
+            body = getattr(element, kind).body
+            if any(text in body for text in AI_ERRORS):
+                self.ai_errors.append(body)
+        widget = getattr(element, kind, None) if kind else None
+        if widget is not None and hasattr(widget, "id") and hasattr(widget, "label") and widget.id:
+            self.widgets[widget.label] = {
+                "id": widget.id,
+                "type": kind,
+                "fragment_id": fragment_id,
+                "form_id": getattr(widget, "form_id", ""),
+            }
+
+    # Messages to the server
+    async def rerun(self, triggers=(), fragment_id="", auto=False):
+        """Send the widget values and wait for the run to finish; returns seconds"""
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_script_hash
+        state.fragment_id = fragment_id
+        state.is_auto_rerun = auto
+        for widget_state in self.states.values():
+            state.widget_states.widgets.append(widget_state)
+        for widget_id in triggers:
+            state.widget_states.widgets.append(WidgetState(id=widget_id, trigger_value=True))
+        self._finished = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        await self.websocket.send(msg.SerializeToString())
+        await asyncio.wait_for(self._finished, self.timeout)
+        return time.perf_counter() - started
+
+    async def _poll(self):
+        """Rerun fragments with run_every while the user is idle, like the browser"""
+        while True:
+            await asyncio.sleep(min(self.fragments.values(), default=0.5))
+            for fragment_id in list(self.fragments):
+                if self._busy.locked() or fragment_id not in self.fragments:
+                    continue
+                async with self._busy:
+                    self.poll_seconds.append(await self.rerun(fragment_id=fragment_id, auto=True))
+
+    def widget(self, label):
+        for name, widget in self.widgets.items():
+            if name.startswith(label):
+                return widget
+        raise LookupError(f"No widget labelled {label!r} on screen (have {sorted(self.widgets)})")
+
+    def _type(self, label, value):
+        widget = self.widget(label)
+        state = WidgetState(id=widget["id"])
+        if VALUE_FIELDS[widget["type"]] == "double_array_value":
+            state.double_array_value.data.append(value)
+        else:
+            setattr(state, VALUE_FIELDS[widget["type"]], value)
+        self.states[widget["id"]] = state
+        return widget
+
+    # User actions wait for a fragment poll in flight: the widgets on screen
+    # are only settled between runs
+    async def start(self):
+        async with self._busy:
+            return await self.rerun()
+
+    async def fill(self, values):
+        """Fill widgets inside a form: nothing runs until it is submitted"""
+        async with self._busy:
+            for label, value in values.items():
+                self._type(label, value)
+        return []
+
+    async def set(self, label, value):
+        """Change a widget outside a form: reruns its fragment, or the app"""
+        async with self._busy:
+            widget = self._type(label, value)
+            return await self.rerun(fragment_id=widget["fragment_id"])
+
+    async def click(self, label):
+        async with self._busy:
+            widget = self.widget(label)
+            fragment_id = "" if widget["form_id"] else widget["fragment_id"]
+            return await self.rerun([widget["id"]], fragment_id)
+
+
+def flow_steps(rng, index):
+    """(name, action) pairs walking one user from home to the calculator.
+
+    Actions return the rerun seconds they caused (one or several). Stories
+    are unique per user; groups come from a small shared pool, so caches
+    see the overlap real traffic has.
+    """
+    groups = rng.sample(GROUPS, 3)
+
+    def fill_story(s):
+        return s.fill({
+            "What life challenge": f"Panic attacks before presentations at work (user {index})",
+            "What transformation": "I can now notice the panic rising and let it pass",
+        })
+
+    def fill_groups(s):
+        return s.fill({f"Group {i + 1}": group for i, group in enumerate(groups)})
+
+    async def fill_narrow(s):
+        return [await s.set("What specific struggle", "racing thoughts and guilt"),
+                await s.set("When is this struggle", "during the 3am feed")]
+
+    def fill_test(s):
+        return s.fill({
+            "Can you think of at least 50": "Yes - I can name 50+ people",
+            "Write one sentence": "Do you lie awake at 3am replaying the day?",
+        })
+
+    def fill_offerings(s):
+        return s.fill({
+            "When are your people": "Weekday mornings",
+            "What format": "6-week series",
+            "Where would they": "Online via Zoom",
+        })
+
+    async def move_sliders(s):
+        seconds = []
+        for label, low, high in [("Price per student", 50, 300), ("Students per series", 5, 20),
+                                 ("Series per year", 2, 10), ("Monthly subscription members", 5, 40),
+                                 ("Corporate workshops per year", 0, 8)]:
+            seconds.append(await s.set(label, float(rng.randint(low, high))))
+        return seconds
+
+    return [
+        ("home", lambda s: s.start()),
+        ("open_niche", lambda s: s.click("Start Niche Finder")),
+        ("welcome_begin", lambda s: s.click("Let's Begin! →")),
+        ("story_fill", fill_story),
+        ("story_continue", lambda s: s.click("Continue →")),
+        ("groups_fill", fill_groups),
+        ("groups_continue", lambda s: s.click("Continue →")),
+        ("select_group_pick", lambda s: s.set("Which group", groups[0])),
+        ("select_group_continue", lambda s: s.click("Continue →")),
+        ("narrow_fill", fill_narrow),
+        ("narrow_continue", lambda s: s.click("Continue →")),
+        ("test_fill", fill_test),
+        ("test_feedback", lambda s: s.click("Get Feedback")),
+        ("test_continue", lambda s: s.click("Continue →")),
+        ("offerings_fill", fill_offerings),
+        ("offerings_generate", lambda s: s.click("Generate My Three Offerings")),
+        ("complete_to_calculator", lambda s: s.click("💰 Go to Calculator")),
+        ("calculator_sliders", move_sliders),
+    ]
+
+
+async def run_user(index, url, start_delay, think_time, timeout, seed):
+    """Walk one user through the flow; returns their reruns and outcome"""
+    rng = random.Random(seed * 100003 + index)
+    await asyncio.sleep(start_delay)
+    session = Session(url, timeout)
+    result = {"user": index, "reruns": [], "failed_step": None, "error": None}
+    name = "connect"
+    try:
+        await session.connect()
+        for name, action in flow_steps(rng, index):
+            outcome = await action(session)
+            for seconds in outcome if isinstance(outcome, list) else [outcome]:
+                result["reruns"].append((name, seconds))
+            if session.exceptions:
+                raise RuntimeError(f"App raised: {session.exceptions[0]}")
+            if think_time:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+    except Exception as e:
+        result["failed_step"] = name
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        await session.close()
+    result["poll_seconds"] = session.poll_seconds
+    result["ai_errors"] = len(session.ai_errors)
+    return result
+
+
+# ============================================
+# ROUNDS
+# ============================================
+
+def percentile(values, q):
+    """q-th percentile (0-100) with linear interpolation"""
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _latency(values):
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4) if values else None,
+        "p99": round(percentile(values, 99), 4) if values else None,
+        "max": round(max(values), 4) if values else None,
+    }
+
+
+def run_round(users, args):
+    """Fresh mock API and server, then `users` concurrent sessions"""
+    mock = MockAnthropic(latency=args.latency, chunk_delay=args.chunk_delay,
+                         error_rate=args.error_rate, seed=args.seed).start()
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="load_test_") as scratch:
+        workdir = Path(scratch)
+        write_secrets(workdir, mock.url, dict(args.secret))
+        process = start_server(workdir, port)
+        try:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            if args.warmup:
+                # Lazy imports and first-use setup shouldn't count as session growth;
+                # the warm-up also leaves cached replies behind, like a pod that has been up
+                for result in asyncio.run(_run_users(args.warmup, url, args, warmup=True)):
+                    if result["failed_step"]:
+                        raise RuntimeError(f"Warm-up failed at {result['failed_step']}: {result['error']}")
+                mock.reset()
+            sampler = ProcessSampler(process.pid, args.sample_interval)
+            baseline_rss = sampler.read()[2]
+            sampler.start()
+            started = time.perf_counter()
+            results = asyncio.run(_run_users(users, url, args))
+            wall = time.perf_counter() - started
+            time.sleep(args.settle)
+            sampler.stop()
+            server = sampler.summary(baseline_rss)
+        finally:
+            stop_server(process)
+            mock.stop()
+
+    reruns = [seconds for result in results for _, seconds in result["reruns"]]
+    by_step = {}
+    for result in results:
+        for step, seconds in result["reruns"]:
+            by_step.setdefault(step, []).append(seconds)
+    api = mock.stats()
+    failed = [result for result in results if result["failed_step"]]
+    return {
+        "users": users,
+        "completed": users - len(failed),
+        "failed": [{"user": r["user"], "step": r["failed_step"], "error": r["error"]} for r in failed],
+        "wall_seconds": round(wall, 2),
+        "rerun": _latency(reruns),
+        "rerun_by_step": {step: _latency(values) for step, values in by_step.items()},
+        "poll_rerun": _latency([seconds for result in results for seconds in result["poll_seconds"]]),
+        "ai_errors_shown": sum(result["ai_errors"] for result in results),
+        "server": {**server, "rss_growth_per_user_mb": round(server["rss_growth_mb"] / users, 2)},
+        "api": {**api, "per_user": round(api["requests"] / users, 2)},
+    }
+
+
+async def _run_users(users, url, args, warmup=False):
+    if warmup:
+        return await asyncio.gather(*[run_user(-1 - i, url, 0, 0, args.timeout, args.seed) for i in range(users)])
+    return await asyncio.gather(*[
+        run_user(i, url, args.ramp * i / users, args.think_time, args.timeout, args.seed)
+        for i in range(users)
+    ])
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def _ms(value):
+    return f"{value * 1000:.0f}" if value is not None else "-"
+
+
+def print_round(result):
+    server, api, rerun = result["server"], result["api"], result["rerun"]
+    print(f"\n== {result['users']} users: {result['completed']} completed in {result['wall_seconds']}s ==")
+    print(f"Reruns: {rerun['count']}  p50 {_ms(rerun['p50'])} ms  p99 {_ms(rerun['p99'])} ms  "
+          f"max {_ms(rerun['max'])} ms  (fragment polls: {result['poll_rerun']['count']})")
+    print(f"{'step':<26}{'reruns':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for step, latency in result["rerun_by_step"].items():
+        print(f"{step:<26}{latency['count']:>8}{_ms(latency['p50']):>10}{_ms(latency['p99']):>10}")
+    print(f"Server CPU: {server['cpu_percent_avg']}% avg, {server['cpu_percent_peak']}% peak "
+          f"({server['cpu_seconds']} CPU s)")
+    print(f"Server RSS: {server['rss_start_mb']} MB -> peak {server['rss_peak_mb']} MB, end {server['rss_end_mb']} MB "
+          f"(+{server['rss_growth_mb']} MB, {server['rss_growth_per_user_mb']} MB per user)")
+    print(f"API calls: {api['requests']} ({api['per_user']} per user), {api['errors']} injected errors, "
+          f"{result['ai_errors_shown']} AI errors shown to users")
+    print("  by stage: " + ", ".join(f"{stage} {count}" for stage, count in sorted(api["by_stage"].items())))
+    for failure in result["failed"]:
+        print(f"  user {failure['user']} failed at {failure['step']}: {failure['error']}")
+
+
+def print_summary(rounds, slo):
+    print(f"\n{'users':>6}{'done':>6}{'p50 ms':>9}{'p99 ms':>9}{'CPU avg %':>11}{'RSS +MB':>9}{'API/user':>10}")
+    for result in rounds:
+        print(f"{result['users']:>6}{result['completed']:>6}{_ms(result['rerun']['p50']):>9}"
+              f"{_ms(result['rerun']['p99']):>9}{result['server']['cpu_percent_avg']:>11}"
+              f"{result['server']['rss_growth_mb']:>9}{result['api']['per_user']:>10}")
+    if slo:
+        within = [r["users"] for r in rounds
+                  if not r["failed"] and r["rerun"]["p99"] is not None and r["rerun"]["p99"] <= slo]
+        print(f"Largest user count with p99 <= {slo}s and no failures: {max(within) if within else 'none'}")
+
+
+def _secret(text):
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[5], help="concurrent users, one round per count")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=1, help="average pause between steps, in seconds")
+    parser.add_argument("--latency", type=float, default=0.5, help="mock API delay before each reply, in seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="mock API delay between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API calls failing with 429/500/529")
+    parser.add_argument("--warmup", type=int, default=1, help="users walked through the flow before measuring")
+    parser.add_argument("--secret", type=_secret, action="append", default=[], metavar="KEY=VALUE",
+                        help="extra app secret, e.g. PREFETCH_WORKERS=16 (values parsed as JSON when possible)")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for one rerun")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="seconds between CPU/RSS samples")
+    parser.add_argument("--settle", type=float, default=2, help="seconds to keep sampling after the last user")
+    parser.add_argument("--slo", type=float, help="p99 rerun seconds a round must stay under")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    rounds = []
+    for users in args.users:
+        result = run_round(users, args)
+        print_round(result)
+        rounds.append(result)
+    print_summary(rounds, args.slo)
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {**{key: value for key, value in vars(args).items() if key != "output"},
+                       "secret": dict(args.secret)},
+            "rounds": rounds,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Local HTTP stand-in for the Anthropic Messages API.
+
+Serves POST /v1/messages the way the real API does, plain JSON or a
+server-sent event stream, so the app's real `anthropic` client and its
+retry, rate-limit and connection-pool code all run. Point the app at it
+with ANTHROPIC_BASE_URL. Replies are the deterministic ones of
+stub_anthropic.py.
+
+Latency (seconds before the reply starts, and between streamed chunks) and
+the share of requests that fail with a 429, 500 or 529 are configurable.
+
+    python benchmarks/mock_anthropic_server.py --port 8765 --latency 0.5 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import stub_anthropic
+
+# Status, error type and Retry-After of the injected failures
+ERRORS = [
+    (429, "rate_limit_error", "1"),
+    (500, "api_error", None),
+    (529, "overloaded_error", None),
+]
+JSON_CHUNK_CHARS = 40
+
+
+def _usage(request, text):
+    prompt = json.dumps(request.get("messages")) + json.dumps(request.get("system", ""))
+    return {
+        "input_tokens": len(prompt) // 4,
+        "cache_read_input_tokens": 0,
+        "cache_creation_input_tokens": 0,
+        "output_tokens": max(1, len(text) // 4),
+    }
+
+
+def _reply(request):
+    """(content block, text used for streaming, stop reason) for a request"""
+    if request.get("tools"):
+        data = stub_anthropic.tool_input(request)
+        block = {"type": "tool_use", "id": "toolu_mock", "name": request["tools"][0]["name"], "input": data}
+        return block, json.dumps(data), "tool_use"
+    text = stub_anthropic.reply_text(request)
+    return {"type": "text", "text": text}, text, "end_turn"
+
+
+class MockAnthropic:
+    """Mock API server on a background thread; counts the requests it served"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, chunk_delay=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-anthropic", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+
+    def _record(self, request, error):
+        with self._lock:
+            self.requests.append({
+                "at": time.time(),
+                "stage": stub_anthropic.stage_of(request),
+                "model": request.get("model"),
+                "max_tokens": request.get("max_tokens"),
+                "stream": bool(request.get("stream")),
+                "tool": bool(request.get("tools")),
+                "error": error,
+            })
+
+    def _pick_error(self):
+        with self._lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.random.choice(ERRORS)
+        return None
+
+    def stats(self):
+        """Request counts overall, by stage and by model, plus injected errors"""
+        with self._lock:
+            requests = list(self.requests)
+        by_stage, by_model = {}, {}
+        for request in requests:
+            by_stage[str(request["stage"])] = by_stage.get(str(request["stage"]), 0) + 1
+            by_model[request["model"]] = by_model.get(request["model"], 0) + 1
+        errors = sum(1 for request in requests if request["error"])
+        return {
+            "requests": len(requests),
+            "succeeded": len(requests) - errors,
+            "errors": errors,
+            "by_stage": by_stage,
+            "by_model": by_model,
+        }
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.split("?")[0] != "/v1/messages":
+                    self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+                    return
+                request = json.loads(body or b"{}")
+                error = mock._pick_error()
+                mock._record(request, error[0] if error else None)
+                if mock.latency:
+                    time.sleep(mock.latency)
+                if error:
+                    status, kind, retry_after = error
+                    headers = {"retry-after": retry_after} if retry_after else {}
+                    self._send_json(status, {"type": "error", "error": {"type": kind, "message": "injected"}}, headers)
+                elif request.get("stream"):
+                    self._stream(request)
+                else:
+                    block, text, stop_reason = _reply(request)
+                    self._send_json(200, {
+                        "id": "msg_mock",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": request.get("model"),
+                        "content": [block],
+                        "stop_reason": stop_reason,
+                        "stop_sequence": None,
+                        "usage": _usage(request, text),
+                    })
+
+            def _send_json(self, status, data, headers=None):
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _event(self, kind, data):
+                payload = f"event: {kind}\ndata: {json.dumps({'type': kind, **data})}\n\n".encode("utf-8")
+                # Chunked transfer encoding keeps the connection alive for the next request
+                self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, request):
+                block, text, stop_reason = _reply(request)
+                usage = _usage(request, text)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self._event("message_start", {"message": {
+                    "id": "msg_mock", "type": "message", "role": "assistant", "model": request.get("model"),
+                    "content": [], "stop_reason": None, "stop_sequence": None,
+                    "usage": {**usage, "output_tokens": 1},
+                }})
+                if block["type"] == "tool_use":
+                    self._event("content_block_start", {"index": 0, "content_block": {**block, "input": {}}})
+                    deltas = [{"type": "input_json_delta", "partial_json": text[i:i + JSON_CHUNK_CHARS]}
+                              for i in range(0, len(text), JSON_CHUNK_CHARS)]
+                else:
+                    self._event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+                    deltas = [{"type": "text_delta", "text": chunk} for chunk in stub_anthropic.chunks(text)]
+                for delta in deltas:
+                    if mock.chunk_delay:
+                        time.sleep(mock.chunk_delay)
+                    self._event("content_block_delta", {"index": 0, "delta": delta})
+                self._event("content_block_stop", {"index": 0})
+                self._event("message_delta", {"delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                                              "usage": {"output_tokens": usage["output_tokens"]}})
+                self._event("message_stop", {})
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each reply starts")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/500/529")
+    parser.add_argument("--seed", type=int, help="seed for the injected errors")
+    args = parser.parse_args(argv)
+
+    mock = MockAnthropic(args.host, args.port, args.latency, args.chunk_delay, args.error_rate, args.seed).start()
+    print(f"Mock Anthropic API on {mock.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(10)
+            print(json.dumps(mock.stats()))
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
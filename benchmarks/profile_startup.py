@@ -0,0 +1,176 @@
+"""Cold-start profile of the app: import time and first render per page.
+
+Each page is measured in a fresh Python process, the way the first visitor
+to a new container meets it: Streamlit is imported, then app.py is run
+once with Streamlit's AppTest on that page. The process runs under
+`python -X importtime`, so every module the first render imports is
+accounted for; the report lists the render time, how much of it was
+imports, which heavy dependencies were loaded and the slowest imports.
+
+The real `anthropic` package is used (importing it is part of what is
+measured) but the niche page's first render makes no API calls.
+
+    python benchmarks/profile_startup.py --repeat 5
+    python benchmarks/profile_startup.py --output startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+APP_PATH = REPO_DIR / "app.py"
+
+PAGES = ["home", "niche", "calculator"]
+HEAVY_MODULES = ["anthropic", "httpx", "numpy", "pandas", "altair", "pyarrow"]
+RENDER_MARKER = "profile_startup: render"
+
+
+# ============================================
+# CHILD PROCESS (one page, fresh interpreter)
+# ============================================
+
+def render_page(page):
+    """Run app.py once on page; prints a JSON result line to stdout"""
+    started = time.perf_counter()
+    import streamlit  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+    streamlit_seconds = time.perf_counter() - started
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=120)
+    at.secrets["ANTHROPIC_API_KEY"] = "profile"
+    at.secrets["TELEMETRY_PATH"] = ""
+    at.secrets["RESPONSE_CACHE_DB"] = ""
+    at.secrets["SESSION_DB"] = ""
+    at.secrets["ANALYTICS_DIR"] = ""
+    at.secrets["MODEL_TIERS"] = {"fast": "stub-fast"}
+    at.session_state["page"] = page
+
+    before = set(sys.modules)
+    # Everything -X importtime prints after this line was imported by the render
+    print(RENDER_MARKER, file=sys.stderr, flush=True)
+    started = time.perf_counter()
+    at.run()
+    render_seconds = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"App raised on page {page}: {at.exception[0].value}")
+
+    loaded = set(sys.modules) - before
+    print(json.dumps({
+        "page": page,
+        "streamlit_import_seconds": streamlit_seconds,
+        "render_seconds": render_seconds,
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+        "modules_imported": len(loaded),
+    }))
+
+
+# ============================================
+# PARENT PROCESS
+# ============================================
+
+def parse_importtime(stderr):
+    """Top-level imports made after the render marker: [(module, cumulative seconds)]"""
+    lines = stderr.splitlines()
+    if RENDER_MARKER in lines:
+        lines = lines[lines.index(RENDER_MARKER) + 1:]
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented under the module that pulled them in
+        if name.startswith(" ") and not name.startswith("  "):
+            imports.append((name.strip(), int(cumulative) / 1e6))
+    return imports
+
+
+def profile_page(page):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--child", page],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Profiling {page} failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(completed.stderr)
+    result["import_seconds"] = sum(seconds for _, seconds in imports)
+    result["top_imports"] = sorted(imports, key=lambda item: -item[1])[:5]
+    return result
+
+
+def profile(repeat):
+    pages = []
+    for page in PAGES:
+        runs = [profile_page(page) for _ in range(repeat)]
+        first = runs[0]
+        pages.append({
+            "page": page,
+            "render_median_seconds": round(statistics.median(r["render_seconds"] for r in runs), 4),
+            "import_median_seconds": round(statistics.median(r["import_seconds"] for r in runs), 4),
+            "streamlit_import_median_seconds": round(
+                statistics.median(r["streamlit_import_seconds"] for r in runs), 4
+            ),
+            "heavy_modules": first["heavy_modules"],
+            "modules_imported": first["modules_imported"],
+            "top_imports": [[name, round(seconds, 4)] for name, seconds in first["top_imports"]],
+        })
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "pages": pages,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def print_report(result):
+    print(f"{'page':<12}{'render s':>10}{'imports s':>11}{'modules':>9}  heavy dependencies loaded")
+    for page in result["pages"]:
+        print(f"{page['page']:<12}{page['render_median_seconds']:>10.4f}{page['import_median_seconds']:>11.4f}"
+              f"{page['modules_imported']:>9}  {', '.join(page['heavy_modules']) or '-'}")
+    print()
+    print(f"Streamlit import (before any page): {result['pages'][0]['streamlit_import_median_seconds']:.4f}s")
+    for page in result["pages"]:
+        slowest = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in page["top_imports"])
+        print(f"Slowest imports on {page['page']}: {slowest or '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per page (median is reported)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--child", choices=PAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, str(REPO_DIR))
+        render_page(args.child)
+        return
+
+    result = profile(args.repeat)
+    print_report(result)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
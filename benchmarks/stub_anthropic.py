@@ -0,0 +1,263 @@
+"""Deterministic stand-in for the `anthropic` package.
+
+Install it with install() before the app is imported or run, and every
+client the app builds talks to this module instead of the API. Replies are
+derived from a hash of the request so they are identical across runs.
+
+Latency is configurable (seconds before the first token, and per streamed
+chunk) through configure() or the STUB_LLM_LATENCY / STUB_LLM_CHUNK_DELAY
+environment variables.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import types
+
+LATENCY = float(os.environ.get("STUB_LLM_LATENCY", "0"))
+CHUNK_DELAY = float(os.environ.get("STUB_LLM_CHUNK_DELAY", "0"))
+
+_calls = []
+_lock = threading.Lock()
+
+
+def configure(latency=None, chunk_delay=None):
+    global LATENCY, CHUNK_DELAY
+    if latency is not None:
+        LATENCY = latency
+    if chunk_delay is not None:
+        CHUNK_DELAY = chunk_delay
+
+
+def install():
+    """Replace `anthropic` in sys.modules with this stub"""
+    sys.modules["anthropic"] = sys.modules[__name__]
+
+
+def reset_calls():
+    with _lock:
+        _calls.clear()
+
+
+def calls():
+    """One dict per request: stage, stream flag, model, max_tokens"""
+    with _lock:
+        return list(_calls)
+
+
+# ============================================
+# REQUEST HANDLING
+# ============================================
+
+def stage_of(kwargs):
+    """The "Current stage: ..." the app puts in the prompt, or None"""
+    for message in kwargs.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            match = re.search(r"Current stage: (\w+)", content)
+            if match:
+                return match.group(1)
+    return None
+
+
+def _record(kwargs, stream):
+    with _lock:
+        _calls.append({
+            "stage": stage_of(kwargs),
+            "stream": stream,
+            "model": kwargs.get("model"),
+            "max_tokens": kwargs.get("max_tokens"),
+        })
+
+
+def reply_text(kwargs):
+    """Text reply for a request; mock_anthropic_server.py serves the same ones"""
+    digest = hashlib.sha256(repr(kwargs.get("messages")).encode("utf-8")).hexdigest()[:8]
+    return f"Stub reply {digest}. This is a deterministic answer used for benchmarking."
+
+
+def _fill(schema, seed, index=0):
+    """A value matching a tool's JSON schema; enums take the index-th option"""
+    if "enum" in schema:
+        return schema["enum"][index % len(schema["enum"])]
+    if schema.get("type") == "object":
+        return {name: _fill(prop, f"{seed} {name}", index)
+                for name, prop in schema.get("properties", {}).items()}
+    if schema.get("type") == "array":
+        return [_fill(schema["items"], seed, i) for i in range(schema.get("minItems", 1))]
+    return f"Stub {seed}."
+
+
+def tool_input(kwargs):
+    """Input for the request's first tool, filled in from its schema"""
+    digest = hashlib.sha256(repr(kwargs.get("messages")).encode("utf-8")).hexdigest()[:8]
+    return _fill(kwargs["tools"][0]["input_schema"], digest)
+
+
+def _snapshots(data):
+    """Growing prefixes of a tool input, like the SDK's input_json snapshots"""
+    snapshot = {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            for i in range(len(value)):
+                snapshot[key] = value[:i + 1]
+                yield dict(snapshot)
+        else:
+            snapshot[key] = value
+            yield dict(snapshot)
+
+
+def _usage(kwargs, text):
+    prompt = repr(kwargs.get("messages")) + repr(kwargs.get("system", ""))
+    return types.SimpleNamespace(
+        input_tokens=len(prompt) // 4,
+        cache_read_input_tokens=0,
+        cache_creation_input_tokens=0,
+        output_tokens=len(text) // 4,
+    )
+
+
+def chunks(text):
+    words = text.split(" ")
+    return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+
+class _Message:
+    def __init__(self, kwargs):
+        if kwargs.get("tools"):
+            data = tool_input(kwargs)
+            text = repr(data)
+            self.content = [types.SimpleNamespace(type="tool_use", id="toolu_stub",
+                                                  name=kwargs["tools"][0]["name"], input=data)]
+            self.stop_reason = "tool_use"
+        else:
+            text = reply_text(kwargs)
+            self.content = [types.SimpleNamespace(type="text", text=text)]
+            self.stop_reason = "end_turn"
+        self.usage = _usage(kwargs, text)
+
+
+class _MessageStream:
+    def __init__(self, kwargs):
+        self._message = _Message(kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        block = self._message.content[0]
+        if block.type != "text":
+            return
+        for chunk in chunks(block.text):
+            if CHUNK_DELAY:
+                time.sleep(CHUNK_DELAY)
+            yield chunk
+
+    def __iter__(self):
+        block = self._message.content[0]
+        if block.type == "tool_use":
+            for snapshot in _snapshots(block.input):
+                if CHUNK_DELAY:
+                    time.sleep(CHUNK_DELAY)
+                yield types.SimpleNamespace(type="input_json", partial_json="", snapshot=snapshot)
+            return
+        for chunk in self.text_stream:
+            yield types.SimpleNamespace(type="text", text=chunk)
+
+    def get_final_message(self):
+        return self._message
+
+
+class _Messages:
+    def create(self, **kwargs):
+        _record(kwargs, stream=False)
+        if LATENCY:
+            time.sleep(LATENCY)
+        return _Message(kwargs)
+
+    def stream(self, **kwargs):
+        _record(kwargs, stream=True)
+        if LATENCY:
+            time.sleep(LATENCY)
+        return _MessageStream(kwargs)
+
+
+class _AsyncMessages:
+    async def create(self, **kwargs):
+        _record(kwargs, stream=False)
+        if LATENCY:
+            await asyncio.sleep(LATENCY)
+        return _Message(kwargs)
+
+
+# ============================================
+# PUBLIC SURFACE THE APP USES
+# ============================================
+
+class Anthropic:
+    def __init__(self, **kwargs):
+        self.messages = _Messages()
+
+    def with_options(self, **kwargs):
+        return self
+
+
+class AsyncAnthropic:
+    def __init__(self, **kwargs):
+        self.messages = _AsyncMessages()
+
+    def with_options(self, **kwargs):
+        return self
+
+
+class _Limits:
+    def __init__(self, max_connections=None, max_keepalive_connections=None, keepalive_expiry=None):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+
+
+DEFAULT_CONNECTION_LIMITS = _Limits(max_connections=1000, max_keepalive_connections=100, keepalive_expiry=5.0)
+
+
+def Timeout(timeout=None, connect=None, **kwargs):
+    return types.SimpleNamespace(timeout=timeout, connect=connect)
+
+
+def DefaultHttpxClient(**kwargs):
+    return None
+
+
+class AnthropicError(Exception):
+    pass
+
+
+class APIError(AnthropicError):
+    pass
+
+
+class APIConnectionError(APIError):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+class APIStatusError(APIError):
+    status_code = 500
+
+
+class RateLimitError(APIStatusError):
+    status_code = 429
+
+
+class InternalServerError(APIStatusError):
+    status_code = 500
@@ -0,0 +1,272 @@
+import threading
+import time
+from collections import deque
+
+from rate_limit import backoff_delay, is_retryable, SingleFlight, TokenBucket
+
+# The anthropic SDK takes about a second to import, so it is only loaded
+# when a client is built; pages that never call the API don't pay for it.
+
+
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_MAX_TOKENS = 1000
+
+
+# ============================================
+# TOKEN ACCOUNTING
+# ============================================
+
+TOKEN_FIELDS = ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens", "output_tokens")
+
+
+def usage_summary(usage):
+    """Token counts for one call; input_tokens is the uncached part"""
+    return {key: getattr(usage, key, 0) or 0 for key in TOKEN_FIELDS}
+
+
+def tool_input(message):
+    """Input of the first tool_use block in a message, or None"""
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use":
+            return block.input
+    return None
+
+
+def cached_input_share(usage):
+    """Fraction of input tokens that were read from the prompt cache"""
+    total = usage["input_tokens"] + usage["cache_read_input_tokens"] + usage["cache_creation_input_tokens"]
+    return usage["cache_read_input_tokens"] / total if total else 0.0
+
+
+# ============================================
+# SHARED CLIENT
+# ============================================
+
+class SharedClient:
+    """One Anthropic client per process, plus health counters for it.
+
+    The underlying HTTP client keeps a pool of keep-alive connections, so
+    sessions reuse open TLS connections instead of dialing a new one on
+    every rerun.
+
+    Requests go through create() and stream(), which share one rate limit
+    across all sessions, retry 429/5xx errors with jittered backoff (the
+    SDK's own retries are off) and coalesce identical requests that are
+    already in flight, so a double-click costs one call.
+    """
+
+    def __init__(self, api_key, timeout=60.0, connect_timeout=5.0, max_connections=20,
+                 max_keepalive_connections=10, keepalive_expiry=30.0, base_url=None,
+                 requests_per_minute=50, burst=5, max_retries=4, backoff_base=1.0, backoff_cap=30.0):
+        self.config = {
+            "timeout": timeout,
+            "connect_timeout": connect_timeout,
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "requests_per_minute": requests_per_minute,
+            "burst": burst,
+            "max_retries": max_retries,
+        }
+        import anthropic
+
+        # anthropic re-exports httpx's Timeout but not Limits
+        Limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+        request_timeout = anthropic.Timeout(timeout, connect=connect_timeout)
+        http_client = anthropic.DefaultHttpxClient(
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=request_timeout
+        )
+        self.client = anthropic.Anthropic(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=request_timeout,
+            http_client=http_client,
+            max_retries=0
+        )
+        self.bucket = TokenBucket(requests_per_minute / 60, burst) if requests_per_minute else None
+        self.flights = SingleFlight()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retries = 0
+        self.coalesced = 0
+        self.throttled_seconds = 0.0
+        self.created_at = time.time()
+        self.calls = 0
+        self.failures = 0
+        self.last_latency = None
+        self.last_success_at = None
+        self.last_error = None
+        self.last_error_at = None
+        self.tokens = {key: 0 for key in TOKEN_FIELDS}
+        self.recent_usage = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    # ============================================
+    # REQUESTS
+    # ============================================
+
+    def create(self, request, key=None):
+        """messages.create through the request layer; returns (message, leader).
+
+        Callers passing the same key while a request is in flight get the
+        same message back with leader=False.
+        """
+        if key is None:
+            return self._create(request), True
+        flight, leader = self.flights.join(key)
+        if not leader:
+            self._count_coalesced()
+            return flight.wait(), False
+        try:
+            message = self._create(request)
+        except Exception as e:
+            self.flights.land(key, flight, error=e)
+            raise
+        self.flights.land(key, flight, result=message)
+        return message, True
+
+    def stream(self, request, key=None, on_success=None):
+        """Stream a reply through the request layer; returns (text chunks, leader).
+
+        The API call runs on its own thread and every caller with the same
+        key follows it, so it finishes (and on_success(text, usage, ttft,
+        wall) runs on that thread) even if the script that started it is
+        interrupted by a rerun.
+
+        For a request with tools the chunks are snapshots of the tool input
+        parsed so far, and on_success gets the final tool input instead of
+        the text.
+        """
+        key = key if key is not None else object()
+        flight, leader = self.flights.join(key)
+        if leader:
+            threading.Thread(
+                target=self._produce, args=(key, flight, request, on_success), daemon=True, name="llm-stream"
+            ).start()
+        else:
+            self._count_coalesced()
+        return flight.follow(), leader
+
+    def _create(self, request):
+        started = time.perf_counter()
+        try:
+            message = self._with_retries(lambda: self.client.messages.create(**request))
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success(time.perf_counter() - started, usage_summary(message.usage))
+        return message
+
+    def _produce(self, key, flight, request, on_success):
+        started = time.perf_counter()
+        first_token = None
+
+        def open_stream():
+            manager = self.client.messages.stream(**request)
+            return manager, manager.__enter__()
+
+        try:
+            # Retry only while opening the stream; once text is out it can't be taken back
+            manager, stream = self._with_retries(open_stream)
+            try:
+                for event in stream:
+                    if event.type not in ("text", "input_json"):
+                        continue
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    flight.publish(event.text if event.type == "text" else event.snapshot)
+                message = stream.get_final_message()
+                usage = usage_summary(message.usage)
+            finally:
+                manager.__exit__(None, None, None)
+        except Exception as e:
+            self.record_failure(e)
+            self.flights.land(key, flight, error=e)
+            return
+        wall = time.perf_counter() - started
+        self.record_success(wall, usage)
+        result = tool_input(message) if request.get("tools") else "".join(flight.chunks)
+        try:
+            if on_success is not None:
+                on_success(result, usage, first_token or wall, wall)
+        finally:
+            self.flights.land(key, flight, result=result)
+
+    def _with_retries(self, send):
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                waited = self.bucket.acquire()
+                if waited:
+                    with self._lock:
+                        self.throttled_seconds += waited
+            try:
+                return send()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, e, self.backoff_base, self.backoff_cap)
+                if self.bucket is not None and getattr(e, "status_code", None) == 429:
+                    self.bucket.pause(delay)
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+                attempt += 1
+
+    def _count_coalesced(self):
+        with self._lock:
+            self.coalesced += 1
+
+    # ============================================
+    # HEALTH
+    # ============================================
+
+    def record_success(self, seconds, usage=None):
+        with self._lock:
+            self.calls += 1
+            self.last_latency = seconds
+            self.last_success_at = time.time()
+            if usage is not None:
+                for key in TOKEN_FIELDS:
+                    self.tokens[key] += usage[key]
+                self.recent_usage.append(usage)
+
+    def record_failure(self, error):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            self.last_error_at = time.time()
+
+    def health(self):
+        """Snapshot of client health for the admin panel"""
+        with self._lock:
+            now = time.time()
+            if self.last_error_at and (not self.last_success_at or self.last_error_at > self.last_success_at):
+                status = "failing"
+            elif self.last_success_at:
+                status = "ok"
+            else:
+                status = "idle"
+            return {
+                "status": status,
+                "uptime_seconds": round(now - self.created_at),
+                "calls": self.calls,
+                "failures": self.failures,
+                "last_latency_seconds": round(self.last_latency, 3) if self.last_latency is not None else None,
+                "seconds_since_success": round(now - self.last_success_at) if self.last_success_at else None,
+                "last_error": self.last_error,
+                "retries": self.retries,
+                "coalesced": self.coalesced,
+                "throttled_seconds": round(self.throttled_seconds, 1),
+                "in_flight": self.flights.in_flight(),
+                "tokens": dict(self.tokens),
+                "cached_input_share": round(cached_input_share(self.tokens), 3),
+                "config": self.config,
+            }
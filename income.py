@@ -0,0 +1,314 @@
+import numpy as np
+
+
+# ============================================
+# CALCULATOR INPUTS
+# ============================================
+
+# Same defaults as the calculator page widgets
+DEFAULT_INPUTS = {
+    "price_per_student": 100,
+    "students_per_series": 10,
+    "series_per_year": 4,
+    "scholarships": 0,
+    "monthly_members": 0,
+    "monthly_price": 30,
+    "corporate_workshops": 0,
+    "corporate_price": 2000,
+    "venue_cost": 50,
+    "insurance_cost": 40,
+    "marketing_cost": 30,
+    "practice_hours": 7,
+    "education_hours": 2,
+    "time_value": 30,
+}
+
+# Currency symbol and default income goals (minimum, side business, full-time)
+CURRENCY_DATA = {
+    "USD ($)": {"symbol": "$", "min_income": 15000, "side_income": 30000, "full_income": 60000},
+    "EUR (€)": {"symbol": "€", "min_income": 13000, "side_income": 25000, "full_income": 50000},
+    "GBP (£)": {"symbol": "£", "min_income": 11000, "side_income": 22000, "full_income": 45000},
+    "CNY (¥)": {"symbol": "¥", "min_income": 100000, "side_income": 200000, "full_income": 400000},
+    "BRL (R$)": {"symbol": "R$", "min_income": 18000, "side_income": 36000, "full_income": 72000},
+    "MXN ($)": {"symbol": "$", "min_income": 75000, "side_income": 150000, "full_income": 300000},
+    "RUB (₽)": {"symbol": "₽", "min_income": 450000, "side_income": 900000, "full_income": 1800000},
+    "ZAR (R)": {"symbol": "R", "min_income": 120000, "side_income": 240000, "full_income": 480000}
+}
+
+# Levers that can be swept on the trade-off map: (label, min, max, step),
+# matching the slider ranges on the calculator page
+LEVERS = {
+    "price_per_student": ("Price per student", 0, 500, 10),
+    "students_per_series": ("Students per series", 3, 50, 1),
+    "series_per_year": ("Series per year", 1, 20, 1),
+    "monthly_members": ("Monthly members", 0, 100, 2),
+    "monthly_price": ("Monthly price", 0, 100, 2),
+    "corporate_workshops": ("Corporate workshops", 0, 52, 1),
+    "corporate_price": ("Corporate price", 500, 10000, 500),
+    "time_value": ("Time value per hour", 10, 100, 2),
+}
+
+# Figures that can be shown on the trade-off map
+METRICS = {
+    "net_income": "Net income",
+    "total_income": "Total income",
+    "effective_hourly": "Effective hourly rate",
+    "total_hours_per_week": "Total weekly hours",
+}
+
+
+def lever_values(lever):
+    """Every value a lever's slider can take (at its map step)"""
+    _, low, high, step = LEVERS[lever]
+    return np.arange(low, high + step, step)
+
+
+# ============================================
+# INCOME ENGINE
+# ============================================
+
+def compute(price_per_student, students_per_series, series_per_year, scholarships,
+            monthly_members, monthly_price, corporate_workshops, corporate_price,
+            venue_cost, insurance_cost, marketing_cost, practice_hours, education_hours,
+            time_value):
+    """Every calculator figure, for scalar or NumPy array inputs.
+
+    Array inputs broadcast against each other, so a whole grid of
+    scenarios is evaluated in one pass. Returns a dict of arrays.
+    """
+    price_per_student = np.asarray(price_per_student, dtype=float)
+    students_per_series = np.asarray(students_per_series, dtype=float)
+    series_per_year = np.asarray(series_per_year, dtype=float)
+    monthly_members = np.asarray(monthly_members, dtype=float)
+    corporate_workshops = np.asarray(corporate_workshops, dtype=float)
+
+    # Income
+    series_income = price_per_student * students_per_series * series_per_year
+    subscription_income = monthly_members * monthly_price * 12
+    corporate_income = corporate_workshops * corporate_price
+    scholarship_cost = scholarships * price_per_student
+    total_income = series_income + subscription_income + corporate_income - scholarship_cost
+
+    # Cash costs
+    monthly_cash_costs = np.asarray(venue_cost + insurance_cost + marketing_cost, dtype=float)
+    annual_cash_costs = monthly_cash_costs * 12
+
+    # Time
+    series_hours = series_per_year * 6 * 1.5
+    monthly_hours = np.where(monthly_members > 0, 52.0, 0.0)
+    corporate_hours = corporate_workshops * 2
+    total_teaching_hours = series_hours + monthly_hours + corporate_hours
+    teaching_hours_per_week = total_teaching_hours / 52
+
+    base_prep = 5
+    series_prep_ratio = np.maximum(0.5, 2 - (series_per_year - 1) * 0.2)
+    prep_hours_per_week = base_prep + (teaching_hours_per_week * series_prep_ratio)
+
+    total_hours_per_week = teaching_hours_per_week + prep_hours_per_week + practice_hours + education_hours
+    annual_time_costs = total_hours_per_week * 52 * time_value
+
+    # Totals
+    total_costs = annual_cash_costs + annual_time_costs
+    net_income = total_income - total_costs
+    monthly_net = net_income / 12
+    annual_hours = total_hours_per_week * 52
+    effective_hourly = np.where(annual_hours > 0, net_income / np.where(annual_hours > 0, annual_hours, 1), 0.0)
+
+    total_students = (students_per_series * series_per_year) + monthly_members + scholarships
+
+    return {
+        "series_income": series_income,
+        "subscription_income": subscription_income,
+        "corporate_income": corporate_income,
+        "scholarship_cost": scholarship_cost,
+        "total_income": total_income,
+        "monthly_cash_costs": monthly_cash_costs,
+        "annual_cash_costs": annual_cash_costs,
+        "series_hours": series_hours,
+        "monthly_hours": monthly_hours,
+        "corporate_hours": corporate_hours,
+        "total_teaching_hours": total_teaching_hours,
+        "teaching_hours_per_week": teaching_hours_per_week,
+        "series_prep_ratio": series_prep_ratio,
+        "prep_hours_per_week": prep_hours_per_week,
+        "total_hours_per_week": total_hours_per_week,
+        "annual_time_costs": annual_time_costs,
+        "total_costs": total_costs,
+        "net_income": net_income,
+        "monthly_net": monthly_net,
+        "effective_hourly": effective_hourly,
+        "total_students": total_students,
+    }
+
+
+def compute_scalar(inputs):
+    """compute() for one scenario, with plain floats out"""
+    return {name: float(value) for name, value in compute(**inputs).items()}
+
+
+def sweep(inputs, x_lever, y_lever, metric="net_income"):
+    """Evaluate metric over every (x, y) lever combination in one pass.
+
+    Returns (x_values, y_values, grid) with grid[i, j] for y_values[i],
+    x_values[j]; all other inputs stay as given.
+    """
+    x_values = lever_values(x_lever)
+    y_values = lever_values(y_lever)
+    swept = dict(inputs)
+    swept[x_lever] = x_values[np.newaxis, :]
+    swept[y_lever] = y_values[:, np.newaxis]
+    grid = np.broadcast_to(compute(**swept)[metric], (len(y_values), len(x_values)))
+    return x_values, y_values, grid
+
+
+# ============================================
+# GOAL SEEK
+# ============================================
+
+# Levers the solver may move: (label, slider min, slider max, search max).
+# Searching past the slider max shows how far out of reach a goal is.
+GOAL_LEVERS = {
+    "price_per_student": ("Price per student", 0, 500, 5000),
+    "students_per_series": ("Students per series", 3, 50, 500),
+    "series_per_year": ("Series per year", 1, 20, 52),
+    "monthly_members": ("Monthly members", 0, 100, 2000),
+    "corporate_workshops": ("Corporate workshops per year", 0, 52, 365),
+}
+
+
+def goal_seek(inputs, goals, levers=GOAL_LEVERS):
+    """Smallest change to each lever, on its own, that reaches each goal.
+
+    Every whole-number setting of a lever is evaluated in one vectorized
+    pass, so the nonlinear prep-hours model (series_prep_ratio) and the
+    step in hours when the first monthly member joins are handled exactly.
+    goals maps a goal name to the net income it needs. Returns one row per
+    lever: {"lever", "current", goal name: {"value", "change", "net_income",
+    "within_slider"} or None if the goal can't be reached with that lever}.
+    """
+    rows = []
+    for lever, (_, low, slider_high, search_high) in levers.items():
+        current = inputs[lever]
+        candidates = np.arange(low, search_high + 1)
+        scenario = dict(inputs)
+        scenario[lever] = candidates
+        net_income = np.broadcast_to(compute(**scenario)["net_income"], candidates.shape)
+        distance = np.abs(candidates - current)
+
+        row = {"lever": lever, "current": current}
+        for name, goal in goals.items():
+            reaching = net_income >= goal
+            if not reaching.any():
+                row[name] = None
+                continue
+            # Closest setting that reaches the goal; ties go to the smaller value
+            best = int(np.argmin(np.where(reaching, distance, np.inf)))
+            value = int(candidates[best])
+            row[name] = {
+                "value": value,
+                "change": value - current,
+                "net_income": float(net_income[best]),
+                "within_slider": value <= slider_high,
+            }
+        rows.append(row)
+    return rows
+
+
+# ============================================
+# MONTE CARLO SIMULATION
+# ============================================
+
+SIMULATION_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _beta_params(mean, spread):
+    """Beta(a, b) with the given mean and standard deviation"""
+    mean = min(max(mean, 1e-3), 1 - 1e-3)
+    variance = min(spread ** 2, mean * (1 - mean) * 0.99)
+    if variance <= 0:
+        return None
+    concentration = mean * (1 - mean) / variance - 1
+    return mean * concentration, (1 - mean) * concentration
+
+
+def _member_months_moments(planned, monthly_churn, months=12):
+    """Mean and variance of a year's member-months under churn and replacement.
+
+    Month to month, each member stays with probability 1 - churn and
+    Poisson(planned * churn) new members join. The sum over the year is
+    drawn from a Gamma with these exact moments, which is much cheaper than
+    stepping every sample through twelve months of binomial draws.
+    """
+    stay = 1 - monthly_churn
+    joins = planned * monthly_churn
+    variances = [0.0]
+    for _ in range(months - 1):
+        variances.append(stay ** 2 * variances[-1] + planned * stay * monthly_churn + joins)
+    variance = sum(variances)
+    for i in range(months):
+        for j in range(i + 1, months):
+            variance += 2 * stay ** (j - i) * variances[i]
+    return planned * months, variance
+
+
+def _simulate_chunk(rng, inputs, size, fill_rate, fill_spread, monthly_churn, workshop_booking):
+    # Each scenario draws how well classes fill that year, then actual sign-ups
+    capacity = int(inputs["students_per_series"] * inputs["series_per_year"])
+    params = _beta_params(fill_rate, fill_spread)
+    fill = rng.beta(*params, size=size) if params else np.full(size, fill_rate)
+    enrolled = rng.binomial(capacity, fill)
+    students_per_series = enrolled / inputs["series_per_year"]
+
+    # Members leave at monthly_churn and are replaced by new sign-ups at the
+    # same expected rate, so membership wanders around the planned level
+    member_months = np.zeros(size)
+    planned = int(inputs["monthly_members"])
+    if planned > 0:
+        mean, variance = _member_months_moments(planned, monthly_churn)
+        if variance > 0:
+            member_months = rng.gamma(mean ** 2 / variance, variance / mean, size=size)
+        else:
+            member_months = np.full(size, mean)
+
+    workshops = rng.binomial(int(inputs["corporate_workshops"]), workshop_booking, size=size)
+
+    scenario = dict(inputs)
+    scenario["students_per_series"] = students_per_series
+    scenario["monthly_members"] = member_months / 12
+    scenario["corporate_workshops"] = workshops
+    return compute(**scenario)["net_income"]
+
+
+def simulate(inputs, goals, samples=200_000, fill_rate=0.8, fill_spread=0.15,
+             monthly_churn=0.05, workshop_booking=0.8, seed=None, chunk_size=250_000):
+    """Net income under uncertain enrollment, churn and workshop bookings.
+
+    students_per_series, monthly_members and corporate_workshops are read
+    as capacity/plan; each sample draws a fill rate (Beta with the given
+    mean and spread), binomial enrollment against that capacity, a year of
+    member-months under monthly churn and replacement, and binomial
+    workshop bookings.
+    Samples are drawn in chunks, which bounds the intermediate arrays of
+    each draw; the net incomes themselves are all kept (8 bytes a sample,
+    8 MB per million) so the percentiles are exact.
+
+    Returns {"samples", "mean", "percentiles": {pct: value},
+    "goal_probability": {goal name: P(net income >= goal)}, "net_income": array}.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    remaining = samples
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        parts.append(_simulate_chunk(rng, inputs, size, fill_rate, fill_spread, monthly_churn, workshop_booking))
+        remaining -= size
+    net_income = np.concatenate(parts)
+
+    values = np.percentile(net_income, SIMULATION_PERCENTILES)
+    return {
+        "samples": samples,
+        "mean": float(net_income.mean()),
+        "percentiles": {pct: float(value) for pct, value in zip(SIMULATION_PERCENTILES, values)},
+        "goal_probability": {name: float((net_income >= goal).mean()) for name, goal in goals.items()},
+        "net_income": net_income,
+    }
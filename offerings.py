@@ -0,0 +1,87 @@
+"""The three offerings as structured data: tool schema, validation and text."""
+
+# Tier key -> label, in the order the offerings are shown
+TIERS = {
+    "entry": "Entry Level",
+    "funded": "Funded/Sponsored",
+    "premium": "Premium",
+}
+
+# Field -> (label, description for the model); funder only applies to the funded tier
+FIELDS = {
+    "name": ("Name", "A short, inviting name for the offering"),
+    "audience": ("Who it's for", "Exactly who in the niche this is for"),
+    "funder": ("Who pays", "Funded tier only: who would pay for this group to get help, and how to pitch it to them"),
+    "format": ("Format", "Format and length, respecting the teacher's preferred format and location"),
+    "schedule": ("Schedule", "When it runs, respecting the teacher's availability"),
+    "experience": ("What participants experience", "What happens in the sessions, concretely"),
+    "why_it_fits": ("Why it fits", "Why it meets this niche at its most acute moment"),
+}
+REQUIRED_FIELDS = ["tier", "name", "audience", "format", "schedule", "experience", "why_it_fits"]
+MAX_FIELD_CHARS = 600
+
+
+def offering_schema(tiers=tuple(TIERS)):
+    """JSON schema for one offering; pass one tier to pin it (pinned to funded, funder is required)"""
+    properties = {"tier": {"type": "string", "enum": list(tiers)}}
+    for field, (_, description) in FIELDS.items():
+        properties[field] = {"type": "string", "description": description}
+    required = REQUIRED_FIELDS + (["funder"] if list(tiers) == ["funded"] else [])
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def record_offering_tool(tier):
+    """Tool the model must call to return the offering of one tier"""
+    return {
+        "name": "record_offering",
+        "description": f"Record one {TIERS[tier]} offering.",
+        "input_schema": offering_schema([tier]),
+    }
+
+
+# ============================================
+# VALIDATION
+# ============================================
+
+def validate_offering(data, tier=None):
+    """A clean copy of one offering; raises ValueError if it doesn't fit the schema"""
+    if not isinstance(data, dict):
+        raise ValueError("offering is not an object")
+    if data.get("tier") not in TIERS or (tier is not None and data["tier"] != tier):
+        raise ValueError(f"unexpected tier {data.get('tier')!r}")
+    offering = {"tier": data["tier"]}
+    for field in FIELDS:
+        value = data.get(field)
+        if field == "funder" and data["tier"] != "funded":
+            continue
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{data['tier']} offering has no {field}")
+        offering[field] = value.strip()[:MAX_FIELD_CHARS]
+    return offering
+
+
+def in_tier_order(offerings):
+    """Offerings in the order the tiers are shown (one per tier, the last one wins)"""
+    by_tier = {offering["tier"]: offering for offering in offerings}
+    return [by_tier[tier] for tier in TIERS if tier in by_tier]
+
+
+# ============================================
+# TEXT
+# ============================================
+
+def offering_lines(offering):
+    """(label, text) pairs for the fields an offering (possibly partial) has"""
+    return [(label, offering[field]) for field, (label, _) in FIELDS.items()
+            if field != "name" and offering.get(field)]
+
+
+def offering_text(offering):
+    lines = [f"{TIERS.get(offering.get('tier'), 'Offering')}: {offering.get('name', '')}"]
+    lines += [f"  {label}: {text}" for label, text in offering_lines(offering)]
+    return "\n".join(lines)
+
+
+def offerings_text(offerings):
+    """Plain-text version, for the download, the conversation and analytics"""
+    return "\n\n".join(offering_text(offering) for offering in offerings)
@@ -0,0 +1,68 @@
+from concurrent.futures import CancelledError, TimeoutError
+
+
+# ============================================
+# BACKGROUND PREFETCH
+# ============================================
+
+class Prefetcher:
+    """Per-session background AI calls on a shared thread pool.
+
+    Each task has a name (what it is for) and a key (the inputs it was
+    started from). Submitting the same name with a different key cancels
+    the stale task, so results never outlive the inputs they answer.
+    """
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._tasks = {}  # name -> (key, future)
+
+    def submit(self, name, key, fn, *args):
+        """Start fn(*args) in the background unless it is already running for key"""
+        task = self._tasks.get(name)
+        if task is not None and task[0] == key:
+            return task[1]
+        self.cancel(name)
+        future = self._executor.submit(fn, *args)
+        self._tasks[name] = (key, future)
+        return future
+
+    def result(self, name, key, timeout=0):
+        """Return the finished result for (name, key), or None if not ready.
+
+        Waits up to timeout seconds. A task that failed is forgotten so the
+        caller can fall back to asking directly.
+        """
+        task = self._tasks.get(name)
+        if task is None or task[0] != key:
+            return None
+        future = task[1]
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            return None
+        except (CancelledError, Exception):
+            del self._tasks[name]
+            return None
+
+    def error(self, name, key):
+        """The exception a finished task for (name, key) raised, or None"""
+        task = self._tasks.get(name)
+        if task is None or task[0] != key or not task[1].done() or task[1].cancelled():
+            return None
+        return task[1].exception()
+
+    def pending(self, name, key):
+        """True while a task for (name, key) is still running"""
+        task = self._tasks.get(name)
+        return task is not None and task[0] == key and not task[1].done()
+
+    def cancel(self, name):
+        """Drop a task; it is cancelled if it hasn't started yet"""
+        task = self._tasks.pop(name, None)
+        if task is not None:
+            task[1].cancel()
+
+    def cancel_all(self):
+        for name in list(self._tasks):
+            self.cancel(name)
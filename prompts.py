@@ -0,0 +1,253 @@
+import json
+import re
+
+from offerings import TIERS
+
+
+# ============================================
+# SYSTEM PROMPT (stable across every call)
+# ============================================
+
+# Everything here is identical for every user and every stage, so it goes in
+# the system block. Anything that changes per call belongs in
+# build_user_message() instead. Keep it to what the app needs: the API only
+# caches prefixes of at least min_cacheable_tokens(model), and a shorter
+# prompt is sent without cache_control rather than padded up to that.
+SYSTEM_PROMPT = """You are helping a meditation teacher find their specific teaching niche.
+
+Offerings come in three tiers:
+1. Entry Level - Low commitment, accessible
+2. Funded/Sponsored - Who might pay for this group to get help?
+3. Premium - Higher touch, funds scholarships
+Each offerings request asks for one tier: record that one offering with a single record_offering call."""
+
+# The fast-tier tasks never write offerings, so they get the first line only
+SHORT_SYSTEM_PROMPT = SYSTEM_PROMPT.split("\n")[0]
+
+# Name a route picks (routing.py) -> system prompt
+SYSTEM_PROMPTS = {
+    "full": SYSTEM_PROMPT,
+    "short": SHORT_SYSTEM_PROMPT,
+}
+
+MIN_CACHEABLE_TOKENS = 1024
+# Model families with a higher minimum
+MIN_CACHEABLE_TOKENS_BY_FAMILY = {"haiku": 2048}
+
+
+def min_cacheable_tokens(model):
+    """Shortest prefix the API will cache for this model"""
+    for family, tokens in MIN_CACHEABLE_TOKENS_BY_FAMILY.items():
+        if family in model:
+            return tokens
+    return MIN_CACHEABLE_TOKENS
+
+
+# ============================================
+# PER-CALL MESSAGE (changes every call)
+# ============================================
+
+# Raw turns kept verbatim; older ones are folded into the rolling summary
+RECENT_TURNS = 4
+MAX_SUMMARY_LINES = 12
+MAX_TURN_CHARS = 800
+MIN_FIELD_CHARS = 200
+
+# Default cap for the per-call part of the prompt (the system block is extra)
+CONTEXT_TOKEN_BUDGET = 1500
+
+# Which collected answers each stage actually needs
+STAGE_FIELDS = {
+    'welcome': [],
+    'story': ['challenge', 'transformation'],
+    'groups': ['challenge', 'transformation'],
+    'select_group': ['challenge', 'transformation', 'groups'],
+    'narrow': ['challenge', 'transformation', 'selected_group'],
+    'test': ['selected_group', 'specific_struggle', 'acute_moment', 'specific_who'],
+    'offerings': ['challenge', 'selected_group', 'specific_struggle', 'acute_moment', 'specific_who', 'recognition'],
+    'complete': ['selected_group', 'specific_struggle', 'acute_moment', 'specific_who', 'recognition', 'offerings'],
+}
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def relevant_responses(stage, responses):
+    """Only the answers the current stage needs"""
+    fields = STAGE_FIELDS.get(stage)
+    if fields is None:
+        return dict(responses)
+    return {key: responses[key] for key in fields if key in responses}
+
+
+def digest_turn(turn):
+    """One-line summary of a conversation turn: its first sentence"""
+    text = " ".join(turn['content'].split())
+    first = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(first) > 160:
+        first = first[:157] + "..."
+    return f"{turn['role']}: {first}"
+
+
+def fold_old_turns(conversation, summary, keep=RECENT_TURNS):
+    """Move turns older than the last `keep` into the rolling summary (in place)"""
+    while len(conversation) > keep:
+        summary.append(digest_turn(conversation.pop(0)))
+    del summary[:-MAX_SUMMARY_LINES]
+
+
+def history_bytes(conversation, summary):
+    """UTF-8 size of the stored history text"""
+    return (sum(len(turn['content'].encode('utf-8')) for turn in conversation)
+            + sum(len(line.encode('utf-8')) for line in summary))
+
+
+def fit_history(conversation, summary, max_bytes):
+    """Shrink the stored history to max_bytes (in place).
+
+    The oldest turns are folded into one-line digests first; if that is not
+    enough, the oldest digests are dropped.
+    """
+    while conversation and history_bytes(conversation, summary) > max_bytes:
+        summary.append(digest_turn(conversation.pop(0)))
+    del summary[:-MAX_SUMMARY_LINES]
+    while summary and history_bytes(conversation, summary) > max_bytes:
+        summary.pop(0)
+
+
+def _clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _render_user_message(prompt, context, stage, fields, turns, summary):
+    history = "\n".join(f"{turn['role']}: {_clip(turn['content'], MAX_TURN_CHARS)}" for turn in turns)
+    earlier = "\n".join(summary) if summary else "(none)"
+    return f"""Summary of earlier conversation:
+{earlier}
+
+Previous conversation:
+{history}
+
+Current stage: {stage}
+User data collected: {json.dumps(fields, indent=2)}
+
+{context}
+
+Respond conversationally and guide them based on the current stage.
+
+User input: {prompt}"""
+
+
+def build_user_message(prompt, context, stage, responses, conversation, summary,
+                       token_budget=CONTEXT_TOKEN_BUDGET):
+    """Dynamic part of the prompt, sent after the cached system block.
+
+    Stays within token_budget by dropping the oldest summary lines, then
+    the oldest recent turns, then shortening the longest collected answer.
+    The prompt and context themselves are never cut.
+    """
+    fields = relevant_responses(stage, responses)
+    turns = list(conversation[-RECENT_TURNS:])
+    summary = list(summary)
+    while True:
+        message = _render_user_message(prompt, context, stage, fields, turns, summary)
+        if estimate_tokens(message) <= token_budget:
+            return message
+        if summary:
+            summary.pop(0)
+        elif turns:
+            turns.pop(0)
+        else:
+            longest = max(
+                (key for key, value in fields.items() if isinstance(value, str)),
+                key=lambda key: len(fields[key]),
+                default=None
+            )
+            if longest is None or len(fields[longest]) <= MIN_FIELD_CHARS:
+                return message
+            fields[longest] = _clip(fields[longest], max(MIN_FIELD_CHARS, len(fields[longest]) // 2))
+
+
+def build_request(model, max_tokens, prompt, context, stage, responses, conversation, summary,
+                  token_budget=CONTEXT_TOKEN_BUDGET, tool=None, system=SYSTEM_PROMPT):
+    """Messages API arguments for one call: cached system block + per-call message.
+
+    With a tool, the model is made to answer by calling it, so the reply is
+    the tool's input (structured data) instead of prose.
+    """
+    request = dict(
+        model=model,
+        max_tokens=max_tokens,
+        system=system_blocks(model, system),
+        messages=[
+            {
+                "role": "user",
+                "content": build_user_message(
+                    prompt, context, stage, responses, conversation, summary, token_budget
+                )
+            }
+        ]
+    )
+    if tool is not None:
+        request["tools"] = [tool]
+        request["tool_choice"] = {"type": "tool", "name": tool["name"]}
+    return request
+
+
+def system_blocks(model, system=SYSTEM_PROMPT):
+    """System prompt, marked as a prompt-caching breakpoint once it is long enough for the model to cache"""
+    block = {"type": "text", "text": system}
+    if estimate_tokens(system) >= min_cacheable_tokens(model):
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+# ============================================
+# CALL-SITE PROMPTS (shared by the app and batch_niche.py)
+# ============================================
+
+def build_niche_statement(selected_group, specific_struggle, acute_moment, specific_who=""):
+    who = specific_who if specific_who else selected_group
+    return f"I help {who} who struggle with {specific_struggle}, especially {acute_moment}"
+
+
+def group_insight_prompt(group):
+    return f"The user wants to focus on helping '{group}'. Ask one brief, conversational follow-up question to understand why they connect with this group. Keep it under 2 sentences."
+
+
+def narrow_ideas_prompt(group):
+    return f"Suggest 3 specific struggles that '{group}' commonly face, and for each one the moment it is most acute. Use short bullet points, no introduction."
+
+
+def niche_first_look_prompt(niche):
+    return f"Give a quick first read on this niche: '{niche}'. Is it specific enough to find and reach these people? Two or three sentences."
+
+
+def viability_prompt(niche, size_check, recognition):
+    return f"Analyze this niche: '{niche}'. Size assessment: {size_check}. Recognition phrase: {recognition}. Give brief, encouraging feedback on whether this niche is well-defined and viable."
+
+
+def offering_prompt(niche, tier, availability, format_pref, location, replacing=None, others=()):
+    """Ask for the offering of one tier, with only what that offering needs.
+
+    The three tiers are requested at the same time; when one is redone,
+    replacing and others keep the new one from repeating the rest.
+    """
+    avoid = ""
+    if replacing:
+        avoid += f'They didn\'t connect with "{replacing}", so make it clearly different.\n'
+    if others:
+        names = " and ".join(f'"{name}"' for name in others)
+        avoid += f"Their other offerings are {names}; don't repeat them.\n"
+    return f"""
+                Create the {TIERS[tier]} offering for someone who helps: {niche}
+                
+                Their availability: {availability}
+                Preferred format: {format_pref}
+                Location preference: {location}
+                
+                {avoid}Be specific and practical. No pricing - they'll use calculator for that.
+                Record it with the record_offering tool.
+                """
@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+
+
+# ============================================
+# TOKEN BUCKET
+# ============================================
+
+class TokenBucket:
+    """Request rate limit shared by every session in the process.
+
+    Holds up to `capacity` tokens, refilled at `rate` per second; each
+    request takes one. pause() stops all requests for a while, so a 429 seen
+    by one session slows everyone down instead of each finding out alone.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may go out; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# ============================================
+# RETRIES
+# ============================================
+
+def is_retryable(error):
+    """Rate limits, overload/server errors and dropped connections are worth another try"""
+    import anthropic
+
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait, if it said"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[header]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def backoff_delay(attempt, error, base=1.0, cap=30.0):
+    """Full-jitter exponential backoff, but never sooner than retry-after"""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    asked = retry_after(error)
+    return max(delay, min(asked, cap)) if asked is not None else delay
+
+
+# ============================================
+# SINGLE-FLIGHT
+# ============================================
+
+class Flight:
+    """One in-flight request that any number of callers can wait on or follow"""
+
+    def __init__(self):
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self._cond = threading.Condition()
+
+    def publish(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, result=None, error=None):
+        with self._cond:
+            self.result = result
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def wait(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self.done)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def follow(self):
+        """Yield published chunks as they arrive, from the start; raises the flight's error"""
+        sent = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.done or len(self.chunks) > sent)
+                new = self.chunks[sent:]
+                done = self.done
+            sent += len(new)
+            yield from new
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class SingleFlight:
+    """Coalesce identical concurrent requests onto one Flight"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """(flight, leader); only the leader should make the request"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def land(self, key, flight, result=None, error=None):
+        """Finish the flight and let the next identical request start a new one"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.finish(result, error)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+class ResponseCache:
+    """LRU + TTL cache for Claude responses, optionally backed by SQLite.
+
+    One instance is shared by every session in the process, so a prompt
+    that was already answered (on a rerun, or by another user) is served
+    from memory. When db_path is set, entries also survive restarts; the
+    table is held to the same max_entries and TTL, dropping expired rows
+    and then those closest to expiry on every write.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=6 * 60 * 60, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+            self._prune()
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model, prompt, context):
+        """Stable hash of everything that decides what Claude answers"""
+        payload = json.dumps([model, prompt, context], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < now:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ? AND expires_at >= ?",
+                    (key, now)
+                ).fetchone()
+                if row:
+                    entry = (row[0], row[1])
+                    self._store(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, response):
+        """Cache a response for ttl_seconds"""
+        entry = (response, time.time() + self.ttl_seconds)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, entry[0], entry[1])
+                )
+                self._prune()
+                self._db.commit()
+
+    def _prune(self):
+        """Drop expired rows, then the oldest beyond max_entries"""
+        self._db.execute(
+            "DELETE FROM responses WHERE expires_at < ? OR key IN "
+            "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (time.time(), self.max_entries)
+        )
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counts for the admin panel"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "persistent": self._db is not None,
+            }
@@ -0,0 +1,79 @@
+"""Which model, output cap, system prompt and latency budget each kind of AI call gets.
+
+Short conversational calls (a one-line follow-up question, a quick first
+read) go to the fast tier with the short system prompt; the offerings keep
+the standard model. The fast tier has no built-in model, since dated
+snapshots are retired over time: set it in secrets, or its routes run on
+the standard model (with a logged warning). Routes can be overridden
+there too:
+
+    [MODEL_TIERS]
+    fast = "claude-haiku-4-5"
+
+    [ROUTES.group_insight]
+    tier = "standard"
+    max_tokens = 200
+    latency_budget = 6
+"""
+import logging
+
+from claude_client import DEFAULT_MAX_TOKENS, DEFAULT_MODEL
+from prompts import SYSTEM_PROMPTS
+
+logger = logging.getLogger(__name__)
+
+# Tier -> model; None falls back to the standard model unless set through MODEL_TIERS
+MODEL_TIERS = {
+    "fast": None,
+    "standard": DEFAULT_MODEL,
+}
+
+# task -> tier, max_tokens, system prompt (prompts.SYSTEM_PROMPTS), and the seconds a whole reply should take
+ROUTES = {
+    "chat": {"tier": "standard", "max_tokens": DEFAULT_MAX_TOKENS, "system": "full", "latency_budget": 20},
+    "group_insight": {"tier": "fast", "max_tokens": 150, "system": "short", "latency_budget": 3},
+    "narrow_ideas": {"tier": "fast", "max_tokens": 400, "system": "short", "latency_budget": 6},
+    "niche_first_look": {"tier": "fast", "max_tokens": 200, "system": "short", "latency_budget": 3},
+    "viability_feedback": {"tier": "fast", "max_tokens": 300, "system": "short", "latency_budget": 5},
+    "offering": {"tier": "standard", "max_tokens": 500, "system": "full", "latency_budget": 12},
+    "offering_regenerate": {"tier": "standard", "max_tokens": 500, "system": "full", "latency_budget": 12},
+}
+
+
+class Router:
+    """Looks up the route for a task; unknown tasks get the "chat" route.
+
+    Tiers without a model use the standard one; they are listed in
+    `unset_tiers` for the admin panel.
+    """
+
+    def __init__(self, routes=None, models=None):
+        self.models = {**MODEL_TIERS, **dict(models or {})}
+        self.unset_tiers = [tier for tier, model in self.models.items() if not model]
+        for tier in self.unset_tiers:
+            self.models[tier] = self.models["standard"]
+            logger.warning("MODEL_TIERS.%s is not set; its routes use the standard model %s",
+                           tier, self.models["standard"])
+        self.routes = {task: dict(route) for task, route in ROUTES.items()}
+        for task, route in dict(routes or {}).items():
+            self.routes[task] = {**self.routes.get(task, self.routes["chat"]), **dict(route)}
+        for task, route in self.routes.items():
+            if route["tier"] not in self.models:
+                raise ValueError(f"route {task!r} uses unknown model tier {route['tier']!r}")
+            if route["system"] not in SYSTEM_PROMPTS:
+                raise ValueError(f"route {task!r} uses unknown system prompt {route['system']!r}")
+
+    def route(self, task):
+        """{tier, model, max_tokens, system, latency_budget} for a task"""
+        route = self.routes.get(task, self.routes["chat"])
+        return {
+            "tier": route["tier"],
+            "model": self.models[route["tier"]],
+            "max_tokens": int(route["max_tokens"]),
+            "system": route["system"],
+            "latency_budget": float(route["latency_budget"]),
+        }
+
+    def table(self):
+        """Every route, for the admin panel"""
+        return [{"task": task, **self.route(task)} for task in self.routes]
@@ -0,0 +1,204 @@
+"""Near-duplicate cache: answers for prompts that are almost the same text.
+
+"New Parents", "new parent" and "Nurses who work night shifts" / "nurses
+working night shifts" are different strings but deserve the same group
+insight. Text is normalized (case, punctuation, filler words, word endings,
+word order) and cut into character shingles; a MinHash signature per entry,
+split into LSH bands, finds candidates without comparing against every
+entry, and a candidate is served only if the shingle sets' Jaccard
+similarity reaches the threshold and both texts have the same numbers and
+short words. A one-character change barely moves the shingle score, so
+without that "Women over 50" / "women over 60" (0.83) and "smokers" /
+"non-smokers" would share an answer. It matches spelling, not meaning:
+synonyms ("moms" / "mothers") are separate entries.
+
+Everything is in memory and shared by all sessions in the process.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "with", "who", "that", "in", "on", "at", "to", "are", "is"}
+SHINGLE_SIZE = 3
+# Words this short ("non", "men", "50") change who a group is but hardly move the shingle score
+ANCHOR_LENGTH = 3
+_PRIME = (1 << 61) - 1
+
+
+def _stem(word):
+    """Crude suffix stripping: enough to make "working nurses" match "nurse who works" """
+    for suffix in ("ing", "ed"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize(text):
+    """Sorted lowercase word stems, without punctuation or filler words.
+
+    Word order rarely changes who a group is ("night shift nurses", "nurses
+    on night shifts"), so it is ignored.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return " ".join(sorted(_stem(word) for word in words if word not in STOPWORDS))
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Character shingles of the normalized text (the whole text if it is shorter)"""
+    text = normalize(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def anchors(text):
+    """Numbers and short words of the normalized text, which must match exactly"""
+    return frozenset(word for word in normalize(text).split() if word.isdigit() or len(word) <= ANCHOR_LENGTH)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures from num_perm seeded universal hash functions"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        values = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+                  for s in shingle_set]
+        if not values:
+            return (0,) * len(self.params)
+        return tuple(min((a * v + b) % _PRIME for v in values) for a, b in self.params)
+
+
+class SemanticCache:
+    """Cross-session cache keyed by text similarity instead of exact match.
+
+    Entries live in namespaces (the task and model), so a reply is only
+    served for the same kind of call. Each entry counts the hits it served.
+    """
+
+    def __init__(self, threshold=0.8, max_entries=2000, ttl_seconds=6 * 60 * 60, num_perm=64, bands=16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.lookups = 0
+        self.hits = 0
+        self.exact_hits = 0
+        self._entries = OrderedDict()  # (namespace, normalized text) -> entry
+        self._buckets = {}  # (namespace, band, band values) -> set of entry keys
+        self._lock = threading.Lock()
+
+    def _bands(self, namespace, signature):
+        return [(namespace, band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def get(self, namespace, text):
+        """(response, similarity, matched text) of the closest entry above the threshold, or None"""
+        shingle_set = shingles(text)
+        if not shingle_set:
+            return None
+        key = (namespace, normalize(text))
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] >= now:
+                similarity = 1.0
+            else:
+                entry, similarity = None, 0.0
+                required = anchors(text)
+                signature = self.hasher.signature(shingle_set)
+                candidates = set()
+                for bucket in self._bands(namespace, signature):
+                    candidates |= self._buckets.get(bucket, set())
+                for candidate in candidates:
+                    other = self._entries[candidate]
+                    if other["expires_at"] < now or other["anchors"] != required:
+                        continue
+                    score = jaccard(shingle_set, other["shingles"])
+                    if score > similarity:
+                        entry, similarity = other, score
+                if entry is None or similarity < self.threshold:
+                    return None
+            entry["hits"] += 1
+            entry["last_hit"] = now
+            self._entries.move_to_end(entry["key"])
+            self.hits += 1
+            self.exact_hits += similarity == 1.0
+            return entry["response"], similarity, entry["text"]
+
+    def set(self, namespace, text, response):
+        """Store a reply for text, replacing any entry with the same normalized text"""
+        shingle_set = shingles(text)
+        if not shingle_set:
+            return
+        key = (namespace, normalize(text))
+        signature = self.hasher.signature(shingle_set)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                "key": key,
+                "text": text,
+                "response": response,
+                "shingles": shingle_set,
+                "anchors": anchors(text),
+                "signature": signature,
+                "hits": 0,
+                "created": time.time(),
+                "last_hit": None,
+                "expires_at": time.time() + self.ttl_seconds,
+            }
+            for bucket in self._bands(namespace, signature):
+                self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for bucket in self._bands(key[0], entry["signature"]):
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def stats(self, top=10):
+        """Hit counts overall and for the most used entries, for the admin panel"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: -entry["hits"])[:top]
+            now = time.time()
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "near_hits": self.hits - self.exact_hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "threshold": self.threshold,
+                "top": [
+                    {
+                        "namespace": entry["key"][0],
+                        "text": entry["text"],
+                        "hits": entry["hits"],
+                        "age_seconds": round(now - entry["created"]),
+                        "last_hit_seconds_ago": round(now - entry["last_hit"]) if entry["last_hit"] else None,
+                    }
+                    for entry in entries
+                ],
+            }
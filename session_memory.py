@@ -0,0 +1,58 @@
+import pickle
+import threading
+import time
+
+
+# ============================================
+# SESSION MEMORY
+# ============================================
+
+def state_sizes(state):
+    """Pickled size in bytes of each session-state value (0 if it can't be pickled)"""
+    sizes = {}
+    for key, value in state.items():
+        try:
+            sizes[key] = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Live objects (the prefetcher, widget handles...) are not stored data
+            sizes[key] = 0
+    return sizes
+
+
+class SessionRegistry:
+    """Session-state size of every live session in the process.
+
+    Each script run reports its session's sizes; sessions that Streamlit no
+    longer knows about, or that have been idle for idle_seconds, drop out
+    when the admin panel asks for a snapshot.
+    """
+
+    def __init__(self, idle_seconds=60 * 60):
+        self.idle_seconds = idle_seconds
+        self._sessions = {}  # session id -> row
+        self._lock = threading.Lock()
+
+    def update(self, session_id, sizes, **info):
+        row = {
+            "session": session_id[:8],
+            "bytes": sum(sizes.values()),
+            **info,
+            "largest": ", ".join(f"{key} {size:,}" for key, size in
+                                 sorted(sizes.items(), key=lambda item: -item[1])[:3]),
+            "seen": time.time(),
+        }
+        with self._lock:
+            self._sessions[session_id] = row
+
+    def snapshot(self, is_live=None):
+        """Rows for live sessions, largest first, with a total"""
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            for session_id in list(self._sessions):
+                row = self._sessions[session_id]
+                if row["seen"] < cutoff or (is_live is not None and not is_live(session_id)):
+                    del self._sessions[session_id]
+            rows = sorted(self._sessions.values(), key=lambda row: -row["bytes"])
+        now = time.time()
+        rows = [{**row, "seen": f"{now - row['seen']:.0f}s ago"} for row in rows]
+        return rows, sum(row["bytes"] for row in rows)
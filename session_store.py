@@ -0,0 +1,124 @@
+import atexit
+import hashlib
+import json
+import secrets
+import sqlite3
+import threading
+import time
+
+
+# ============================================
+# SESSION STORE
+# ============================================
+
+class SessionStore:
+    """Checkpoints of each user's progress in SQLite, keyed by a resume token.
+
+    save() only queues a snapshot; a background thread writes everything
+    queued in one transaction every flush_interval seconds, so a burst of
+    reruns costs one write. Snapshots that haven't changed since the last
+    save are skipped. With no db_path nothing is stored.
+    """
+
+    def __init__(self, db_path=None, flush_interval=1.0, ttl_seconds=30 * 24 * 60 * 60):
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self.saves = 0
+        self.writes = 0
+        self.batches = 0
+        self._pending = {}  # token -> (state json, expires_at)
+        self._digests = {}  # token -> digest of the last snapshot queued
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "token TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            threading.Thread(target=self._writer, daemon=True, name="session-writer").start()
+            atexit.register(self.flush)
+
+    @property
+    def persistent(self):
+        """True if snapshots are stored (a db_path was given); no query, so cheap on every rerun"""
+        return self._db is not None
+
+    @staticmethod
+    def new_token():
+        """Opaque, unguessable resume token"""
+        return secrets.token_urlsafe(16)
+
+    def save(self, token, state):
+        """Queue a snapshot (a JSON-able dict) for token; cheap if nothing changed"""
+        if self._db is None:
+            return
+        payload = json.dumps(state, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode("utf-8")).digest()
+        with self._lock:
+            if self._digests.get(token) == digest:
+                return
+            self._digests[token] = digest
+            self._pending[token] = (payload, time.time() + self.ttl_seconds)
+            self.saves += 1
+
+    def load(self, token):
+        """The latest snapshot for token, or None"""
+        if self._db is None or not token:
+            return None
+        with self._lock:
+            entry = self._pending.get(token)
+            if entry is None:
+                entry = self._db.execute(
+                    "SELECT state, expires_at FROM sessions WHERE token = ? AND expires_at >= ?",
+                    (token, time.time())
+                ).fetchone()
+        if entry is None:
+            return None
+        with self._lock:
+            self._digests[token] = hashlib.sha1(entry[0].encode("utf-8")).digest()
+        return json.loads(entry[0])
+
+    def flush(self):
+        """Write every queued snapshot in one transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            batch = [(token, payload, expires_at) for token, (payload, expires_at) in self._pending.items()]
+            self._pending.clear()
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sessions (token, state, expires_at) VALUES (?, ?, ?)", batch
+                )
+                self._db.commit()
+            except sqlite3.Error:
+                # Put the batch back (unless a newer snapshot arrived) and try again next time
+                self._db.rollback()
+                for token, payload, expires_at in batch:
+                    self._pending.setdefault(token, (payload, expires_at))
+                raise
+            self.writes += len(batch)
+            self.batches += 1
+
+    def _writer(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        """Write counts for the admin panel"""
+        with self._lock:
+            stored = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] if self._db else 0
+            return {
+                "sessions_stored": stored,
+                "pending": len(self._pending),
+                "saves": self.saves,
+                "rows_written": self.writes,
+                "batches": self.batches,
+                "persistent": self._db is not None,
+            }
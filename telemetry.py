@@ -0,0 +1,94 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+
+# ============================================
+# LLM CALL TELEMETRY
+# ============================================
+
+class Telemetry:
+    """Per-call LLM metrics, appended to a rotating JSONL file.
+
+    The most recent records are also kept in memory so the admin panel can
+    show latency percentiles without reading the file back.
+    """
+
+    def __init__(self, path="llm_calls.jsonl", max_bytes=5 * 1024 * 1024, backup_count=5, keep=5000):
+        self.path = path
+        self.recent = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._logger = None
+        if path:
+            self._logger = logging.getLogger(f"telemetry.{path}")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            if not self._logger.handlers:
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self._logger.addHandler(handler)
+
+    def record(self, **fields):
+        """Store one call record (e.g. task, stage, outcome, wall_seconds, tokens)"""
+        record = {"ts": round(time.time(), 3), **fields}
+        with self._lock:
+            self.recent.append(record)
+        if self._logger is not None:
+            self._logger.info(json.dumps(record, default=str))
+
+    def percentiles(self, field="wall_seconds", by="stage", outcome="ok"):
+        """p50/p95/p99 of field per group, over recent records with the given outcome"""
+        with self._lock:
+            records = [r for r in self.recent if r.get("outcome") == outcome and r.get(field) is not None]
+        groups = {}
+        for record in records:
+            groups.setdefault(record.get(by), []).append(record[field])
+        rows = []
+        for group, values in sorted(groups.items(), key=lambda item: str(item[0])):
+            values.sort()
+            rows.append({
+                by: group,
+                "calls": len(values),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "p99": round(percentile(values, 99), 3),
+                "max": round(values[-1], 3),
+            })
+        return rows
+
+    def outcomes(self, by="stage"):
+        """Count of each outcome (ok, error, cache_hit...) per group"""
+        with self._lock:
+            records = list(self.recent)
+        counts = {}
+        for record in records:
+            row = counts.setdefault(record.get(by), {by: record.get(by)})
+            outcome = record.get("outcome")
+            row[outcome] = row.get(outcome, 0) + 1
+        return [counts[key] for key in sorted(counts, key=str)]
+
+
+    def budget_misses(self, by="task"):
+        """Successful calls per group, and how many took longer than their latency budget"""
+        with self._lock:
+            records = [r for r in self.recent if r.get("outcome") == "ok" and "over_budget" in r]
+        rows = {}
+        for record in records:
+            row = rows.setdefault(record.get(by), {by: record.get(by), "calls": 0, "over_budget": 0,
+                                                   "budget": record.get("latency_budget")})
+            row["calls"] += 1
+            row["over_budget"] += bool(record["over_budget"])
+        for row in rows.values():
+            row["share"] = round(row["over_budget"] / row["calls"], 3)
+        return [rows[key] for key in sorted(rows, key=str)]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]